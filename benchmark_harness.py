@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Harness Throughput Benchmark
+
+Runs run_evaluation and the LogicKor judge against the local mock server
+(src/mock/server.py) and reports requests/s, harness CPU per request and
+makespan, so performance changes can be checked without real API calls.
+Datasets come from the local snapshots (`python main.py --prefetch`).
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+import requests
+from dataclasses import asdict
+from src.mock.server import add_settings_arguments, settings_from_args
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_server(settings, port):
+    """Runs the mock server in its own process so its CPU is not counted as harness CPU."""
+    command = [sys.executable, "-m", "src.mock.server", "--port", str(port)]
+    for name, value in asdict(settings).items():
+        command += [f"--{name.replace('_', '-')}", str(value)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{url}/stats", timeout=1)
+            return process, url
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Mock server did not start")
+
+
+def measure(name, url, func):
+    """Runs func and returns makespan, request count and harness CPU for it."""
+    before = requests.get(f"{url}/stats").json()["requests"]
+    wall, cpu = time.perf_counter(), time.process_time()
+    func()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    sent = requests.get(f"{url}/stats").json()["requests"] - before
+    return {
+        "phase": name,
+        "requests": sent,
+        "makespan_s": wall,
+        "requests_per_s": sent / wall if wall else 0.0,
+        "cpu_s": cpu,
+        "cpu_ms_per_request": 1000 * cpu / sent if sent else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harness throughput benchmark against the local mock server")
+    parser.add_argument("--samples", type=int, default=20, help="SAMPLE_SIZE per task")
+    parser.add_argument("--models", nargs="+", default=["helpy-pro", "gpt-oss-20b", "gpt-5.2"])
+    parser.add_argument("--benchmarks", nargs="+", default=["kobest", "kmmlu", "haerae", "logickor"])
+    parser.add_argument("--concurrency", type=int, help="Max in-flight requests per model (default: config)")
+    parser.add_argument("--judge-workers", type=int, default=8)
+    parser.add_argument("--output", help="JSON report path (default: results/harness_<timestamp>.json)")
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    process, url = start_mock_server(settings_from_args(args), _free_port())
+    # Must be set before the model adapters are imported
+    os.environ["MLAPI_BASE_URL"] = url
+    os.environ.setdefault("ELICE_API_KEY", "mock")
+
+    import config
+    from src.evaluation.runner import run_evaluation
+    from score_logickor import score_logickor_file
+
+    report_dir = config.RESULTS_DIR
+    config.RESULTS_DIR = tempfile.mkdtemp(prefix="harness_")
+    # Every run measures the endpoint calls: no cached answers, and no concurrency
+    # taken from a data/preflight.json recorded against a real endpoint
+    config.CACHE_MODE = "bypass"
+    config.USE_PREFLIGHT = False
+    config.OFFLINE_DATA = True
+    config.SAMPLE_SIZE = args.samples
+    config.ENABLED_MODELS = args.models
+    config.ENABLED_BENCHMARKS = args.benchmarks
+    if args.concurrency is not None:
+        config.MAX_CONCURRENCY = args.concurrency
+        config.MODEL_CONCURRENCY = {}
+
+    try:
+        phases = [measure("evaluation", url, run_evaluation)]
+        logickor_files = sorted(glob.glob(os.path.join(config.RESULTS_DIR, "*_logickor.csv")))
+        if logickor_files:
+            phases.append(measure("logickor_judge", url, lambda: [
+                score_logickor_file(path, workers=args.judge_workers) for path in logickor_files
+            ]))
+        server_stats = requests.get(f"{url}/stats").json()
+    finally:
+        process.terminate()
+
+    print("\n" + "=" * 60)
+    print("Harness benchmark")
+    print("=" * 60)
+    for phase in phases:
+        cpu = f"{phase['cpu_ms_per_request']:.2f} ms" if phase["cpu_ms_per_request"] is not None else "-"
+        print(f"{phase['phase']}: {phase['requests']} requests in {phase['makespan_s']:.2f}s "
+              f"({phase['requests_per_s']:.1f} req/s), harness CPU {cpu}/request")
+    print(f"Mock server statuses: {server_stats['statuses']}")
+
+    output = args.output or os.path.join(report_dir, f"harness_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"args": vars(args), "phases": phases, "server": server_stats,
+                   "results_dir": config.RESULTS_DIR}, f, ensure_ascii=False, indent=2)
+    print(f"Report saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
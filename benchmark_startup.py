@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark
+
+Times `main.py` commands that do not evaluate (e.g. --help) in fresh interpreters and
+checks that heavy libraries stay unimported, so import-time regressions show up
+before they reach everyone's terminal. Exits non-zero when a budget is exceeded.
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+import statistics
+
+STARTUP_BUDGET_S = 0.5
+COMMANDS = [["--help"]]
+
+# Only the commands that need them may import these
+HEAVY_MODULES = ["pandas", "datasets", "pyarrow", "openai", "google.generativeai", "tqdm", "numpy"]
+
+# Package imports that must stay light: module -> heavy modules it must not pull in
+MODULE_CHECKS = {
+    "src.models": HEAVY_MODULES,
+    "src.models.mlapi": HEAVY_MODULES,
+    "src.benchmarks": ["datasets", "pandas", "pyarrow"],
+    "src.evaluation": HEAVY_MODULES,
+}
+
+_PROBE = """
+import sys, json
+command, heavy = json.loads(sys.argv[1]), json.loads(sys.argv[2])
+sys.argv = ["main.py"] + command
+import main
+try:
+    main.main()
+except SystemExit:
+    pass
+print(json.dumps([name for name in heavy if name in sys.modules]))
+"""
+
+
+def time_command(args, repeat):
+    """Returns wall times of `python main.py <args>` in fresh interpreters."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def heavy_imports(args):
+    output = subprocess.run([sys.executable, "-c", _PROBE, json.dumps(args), json.dumps(HEAVY_MODULES)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def module_heavy_imports(module, heavy):
+    code = f"import sys, {module}; print(' '.join(name for name in {heavy!r} if name in sys.modules))"
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+
+
+def slowest_imports(args, top=10):
+    """Cumulative import times (microseconds) of the slowest modules, from -X importtime."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "main.py", *args],
+                            stdout=subprocess.DEVNULL, capture_output=False, stderr=subprocess.PIPE, text=True).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        entries.append((int(cumulative), module.rstrip()))
+    return sorted(entries, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup / import-time regression benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_S, help="Max median seconds per command")
+    args = parser.parse_args()
+
+    failed = False
+    for command in COMMANDS:
+        times = time_command(command, args.repeat)
+        median = statistics.median(times)
+        heavy = heavy_imports(command)
+        status = "OK" if median <= args.budget and not heavy else "FAIL"
+        failed |= status == "FAIL"
+        print(f"[{status}] main.py {' '.join(command)}: median {median * 1000:.0f} ms "
+              f"(min {min(times) * 1000:.0f} ms, budget {args.budget * 1000:.0f} ms)")
+        if heavy:
+            print(f"       heavy modules imported: {', '.join(heavy)}")
+        if status == "FAIL":
+            for cumulative, module in slowest_imports(command):
+                print(f"       {cumulative / 1000:8.1f} ms  {module}")
+
+    for module, heavy in MODULE_CHECKS.items():
+        imported = module_heavy_imports(module, heavy)
+        failed |= bool(imported)
+        print(f"[{'FAIL' if imported else 'OK'}] import {module}" + (f": pulls in {', '.join(imported)}" if imported else ""))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
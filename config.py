@@ -24,3 +24,81 @@ ENABLED_BENCHMARKS = [
 DATA_DIR = "data"
 RESULTS_DIR = "results"
 LOGS_DIR = "logs"
+
+# Concurrency Settings
+MAX_CONCURRENCY = 1     # Default in-flight requests per model (1 = sequential; e.g. 16, or --concurrency 16)
+MODEL_CONCURRENCY = {}  # Per-model overrides, e.g. {"helpy-pro": 8}
+
+# Endpoint Preflight (`main.py --test-connection`)
+PREFLIGHT_PATH = "data/preflight.json"  # Latency and concurrency knee recorded per model
+USE_PREFLIGHT = False                   # Start runs at the recorded knee (capped by MAX_CONCURRENCY) for models without an override
+PREFLIGHT_MAX_AGE_HOURS = 24            # Older results are ignored
+
+# Response Cache
+CACHE_MODE = "bypass"  # "use" (reuse answers across runs), "refresh" (re-request and overwrite) or "bypass"
+CACHE_PATH = "data/cache/responses.sqlite"
+CACHE_MAX_AGE_DAYS = 30  # None keeps entries forever
+CACHE_MAX_ENTRIES = 1000000
+
+# Rate Limiting (adaptive token bucket per endpoint)
+RATE_LIMIT_INITIAL = 5.0    # Starting requests/s
+RATE_LIMIT_MIN = 0.2        # Floor after repeated throttling
+RATE_LIMIT_MAX = 50.0       # Ceiling for additive ramp-up
+RATE_LIMIT_INCREASE = 0.1   # Added to the rate after each successful request
+RATE_LIMIT_DECREASE = 0.5   # Rate multiplier on 429/502/503/504
+MAX_RETRIES = 5             # Retries for throttled requests and dropped connections
+REPAIR_ATTEMPTS = 3         # Rounds of re-issuing still-failing samples in `main.py --repair`
+
+# Tail Latency (per endpoint and request shape)
+ADAPTIVE_TIMEOUTS = False   # Derive connect/read timeouts from observed latencies instead of the flat 600s
+LATENCY_WINDOW = 500        # Recent successful requests kept per endpoint
+TIMEOUT_MIN_SAMPLES = 20    # Requests observed before timeouts adapt and hedging starts
+TIMEOUT_MULTIPLIER = 3.0    # Timeout = multiplier x observed p99
+TIMEOUT_MIN = 30            # Seconds; floor of the adaptive read timeout
+CONNECT_TIMEOUT_MIN = 3     # Seconds; bounds of the adaptive connect timeout
+CONNECT_TIMEOUT_MAX = 30
+HEDGE_REQUESTS = False      # Send a duplicate once a request runs past the endpoint's p95 latency
+DUPLICATE_BUDGET = 0.05     # Hedges + timeout retries allowed, as a fraction of the run's requests
+
+# Dataset Snapshots
+SNAPSHOT_DIR = "data/snapshots"  # Local Arrow copies written by `main.py --prefetch`
+OFFLINE_DATA = False             # True: never fall back to the Hub when a snapshot is missing
+SAMPLING_DIR = "data/sampling"   # Persisted sample indices per dataset/split/size/seed
+
+# Results Storage
+# "parquet": partitioned store under RESULTS_DIR/store (read by the aggregator)
+# "csv": legacy per-task CSVs, kept while score_logickor.py / analyze_results.py read them
+RESULTS_FORMATS = ["parquet", "csv"]
+
+# Sharding (`main.py --shard i/N --run-id RUN_ID`, then `main.py --merge RUN_ID`)
+SHARD = None  # (i, N): evaluate only slice i of N of the (model, task, sample) plan
+
+# Work Queue (`main.py --queue`, more workers with `main.py --worker RUN_ID`)
+QUEUE_MODE = False
+QUEUE_VISIBILITY_TIMEOUT = 120  # Seconds a lease lasts without a heartbeat before others may take the items
+QUEUE_HEARTBEAT_INTERVAL = 15   # Seconds between lease extensions
+QUEUE_POLL_INTERVAL = 5         # Seconds an idle worker waits for other workers' leases to finish or expire
+QUEUE_MAX_ATTEMPTS = 5          # Leases per item before it is abandoned (e.g. it keeps crashing workers)
+QUEUE_LEASE_SIZE = 32           # Minimum items per lease (also at least 2x the model's concurrency and one pack)
+
+# Streaming
+STREAM_MC = False  # Stream KoBEST/KMMLU/HAE-RAE answers and stop once an explicit answer appears (LogicKor always gets full generations)
+STREAM_USAGE = True  # Ask for token usage in the final stream chunk (stream_options.include_usage)
+
+# Evaluation Mode
+# "generate": free-form answer parsed by the scoring engine
+# "logprob": one-token completion, answer = most likely option token (tasks with fixed options
+#            on adapters that expose top_logprobs; others fall back to "generate")
+EVAL_MODE = "generate"
+TOP_LOGPROBS = 20
+
+# Prompt Packing
+# Questions sent per request for KMMLU / HAE-RAE, e.g. {"kmmlu": 5, "haerae": 5}.
+# Answers come back as a JSON list; items that cannot be parsed are re-asked one at a time.
+PACK_SIZE = {}
+
+# Batch Jobs (main.py --batch)
+BATCH_MODE = "remote"             # "remote": provider /files + /batches API; "local": replay request files against the chat endpoint
+BATCH_MAX_REQUESTS = 50000        # Requests per batch input file
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = 60          # Seconds between status checks
@@ -0,0 +1,69 @@
+import os
+import pytest
+import config
+
+# Tiny KoBEST / LogicKor stand-ins in the column layout of the Hub datasets
+SNAPSHOT_ROWS = 12
+
+
+def _kobest_rows(task, n):
+    if task == "boolq":
+        return {"paragraph": ["p"] * n, "question": [f"q{i}" for i in range(n)], "label": [i % 2 for i in range(n)]}
+    if task == "copa":
+        return {"premise": [f"p{i}" for i in range(n)], "question": ["원인"] * n,
+                "alternative_1": ["a"] * n, "alternative_2": ["b"] * n, "label": [i % 2 for i in range(n)]}
+    if task == "hellaswag":
+        return {"context": [f"c{i}" for i in range(n)], "ending_1": ["a"] * n, "ending_2": ["b"] * n,
+                "ending_3": ["c"] * n, "ending_4": ["d"] * n, "label": [i % 4 for i in range(n)]}
+    if task == "sentineg":
+        return {"sentence": [f"s{i}" for i in range(n)], "label": [i % 2 for i in range(n)]}
+    return {"word": ["w"] * n, "context_1": [f"a{i}" for i in range(n)], "context_2": ["b"] * n, "label": [i % 2 for i in range(n)]}
+
+
+def write_snapshots():
+    """Saves the stand-in datasets where load_source looks for snapshots (config.SNAPSHOT_DIR)."""
+    from datasets import Dataset, DatasetDict
+    from src.benchmarks.snapshot import snapshot_path
+    from src.benchmarks.kobest import TASKS
+    for task in TASKS:
+        DatasetDict({"test": Dataset.from_dict(_kobest_rows(task, SNAPSHOT_ROWS))}).save_to_disk(snapshot_path("skt/kobest_v1", task))
+    questions = [[f"질문 {i}", "후속"] for i in range(SNAPSHOT_ROWS)]
+    DatasetDict({"train": Dataset.from_dict({"questions": questions})}).save_to_disk(snapshot_path("maywell/LogicKor"))
+
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    """Local mock endpoint (src/mock/server.py) that the mlapi.run models are pointed at."""
+    from src.mock import serve, MockSettings
+    import src.models.mlapi as mlapi
+    server = serve(MockSettings(latency_median=0.01, seed=1))
+    monkeypatch.setattr(mlapi, "MLAPI_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("ELICE_API_KEY", "mock")
+    yield server.RequestHandlerClass.state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch, mock_server):
+    """
+    A throwaway working directory with dataset snapshots and the mock endpoint, set up
+    for small offline runs. Returns the mock server state (requests, statuses, settings).
+    """
+    from src.evaluation import samples
+    import src.models.cache as cache
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cache, "_cache", None)
+    for key, value in {
+        "ENABLED_MODELS": ["gpt-oss-20b", "gpt-5.2"], "ENABLED_BENCHMARKS": ["kobest"], "SAMPLE_SIZE": 8,
+        "RESULTS_DIR": "results", "SNAPSHOT_DIR": "data/snapshots", "SAMPLING_DIR": "data/sampling",
+        "CACHE_PATH": "data/cache/responses.sqlite", "PREFLIGHT_PATH": "data/preflight.json",
+        "OFFLINE_DATA": True, "CACHE_MODE": "bypass", "USE_PREFLIGHT": False, "MAX_CONCURRENCY": 4,
+        "MODEL_CONCURRENCY": {}, "RATE_LIMIT_INITIAL": 1000, "SHARD": None, "QUEUE_MODE": False,
+        "RESULTS_FORMATS": ["parquet", "csv"],
+    }.items():
+        monkeypatch.setattr(config, key, value)
+    write_snapshots()
+    samples._load_split.cache_clear()
+    os.makedirs("results", exist_ok=True)
+    return mock_server
@@ -1,8 +1,6 @@
 
 import argparse
 import config
-from src.evaluation.runner import run_evaluation
-from src.reporting import generate_leaderboard
 
 def main():
     # Load env vars
@@ -11,7 +9,21 @@ def main():
     
     parser = argparse.ArgumentParser(description="Korean LLM Benchmark Evaluation")
     parser.add_argument("--dry-run", action="store_true", help="Run a test evaluation with minimal samples")
-    parser.add_argument("--test-connection", action="store_true", help="Test API connections")
+    parser.add_argument("--test-connection", action="store_true", help="Ping every enabled model, find its concurrency knee and record it for the next run")
+    parser.add_argument("--prefetch", action="store_true", help="Download enabled benchmarks into the local snapshot store and exit")
+    parser.add_argument("--import-csv", action="store_true", help="Import existing per-task result CSVs into the Parquet store and exit")
+    parser.add_argument("--packing-report", action="store_true", help="Compare packed vs unpacked KMMLU/HAE-RAE accuracy and exit")
+    parser.add_argument("--concurrency", type=int, help="Max in-flight requests per model (1 = sequential)")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume an interrupted run, skipping completed samples")
+    parser.add_argument("--repair", metavar="RUN_ID", help="Re-issue only the failed samples of a run and merge them into its outputs")
+    parser.add_argument("--batch", choices=["export", "submit", "poll", "ingest", "all"],
+                        help="Offline batch job step: export request files, submit, poll, ingest outputs (or all)")
+    parser.add_argument("--run-id", help="Run id for --batch submit/poll/ingest, or for a new run (e.g. 20260301_090000)")
+    parser.add_argument("--shard", metavar="i/N", help="Evaluate only slice i of N of the work plan (same --run-id on every machine)")
+    parser.add_argument("--queue", action="store_true", help="Publish the work plan to a lease queue that extra --worker processes can join")
+    parser.add_argument("--worker", metavar="RUN_ID", help="Join a --queue run as an extra worker (same host or shared filesystem)")
+    parser.add_argument("--merge", metavar="RUN_ID", help="Merge the shard outputs of a run into one run and exit")
+    parser.add_argument("--cache", choices=["use", "refresh", "bypass"], help="Response cache mode (default: config.CACHE_MODE)")
     
     args = parser.parse_args()
     
@@ -19,14 +31,75 @@ def main():
         print("Dry run mode enabled. Setting sample size to 1.")
         config.SAMPLE_SIZE = 1
     
+    if args.concurrency is not None:
+        config.MAX_CONCURRENCY = args.concurrency
+        config.MODEL_CONCURRENCY = {}
+        config.USE_PREFLIGHT = False
+    
+    if args.cache:
+        config.CACHE_MODE = args.cache
+    
+    if args.queue:
+        config.QUEUE_MODE = True
+    
+    if args.shard:
+        from src.evaluation.shard import parse_shard, get_shard_dir
+        try:
+            config.SHARD = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        if not (args.run_id or args.resume):
+            parser.error("--shard needs the run's shared --run-id (or --resume RUN_ID)")
+        config.RESULTS_DIR = get_shard_dir(args.resume or args.run_id, config.SHARD)
+    
+    if args.prefetch:
+        from src.benchmarks.prefetch import prefetch
+        prefetch()
+        return
+    
+    if args.import_csv:
+        from src.evaluation.store import import_csv_results
+        import_csv_results()
+        return
+    
+    if args.repair:
+        from src.evaluation.repair import repair_run
+        repair_run(args.repair)
+        from src.reporting import generate_leaderboard
+        generate_leaderboard()
+        return
+    
+    if args.worker:
+        from src.evaluation.workqueue import run_queue_worker
+        run_queue_worker(args.worker)
+        return
+    
+    if args.merge:
+        from src.evaluation.shard import merge_shards
+        if merge_shards(args.merge) is not None:
+            from src.reporting import generate_leaderboard
+            generate_leaderboard()
+        return
+    
+    if args.batch:
+        from src.evaluation.batch import run_batch
+        run_batch(args.batch, args.run_id)
+        return
+    
+    if args.packing_report:
+        from src.reporting.packing_report import generate_packing_report
+        generate_packing_report()
+        return
+    
     if args.test_connection:
-        print("Testing API connections...")
-        # Simple test logic or calling a test function
-        # For now, just print config
-        print(f"Enabled Models: {config.ENABLED_MODELS}")
+        from src.models.preflight import run_preflight
+        run_preflight()
         return
 
-    run_evaluation()
+    # Imported here so the commands above start without pandas, datasets or provider SDKs
+    from src.evaluation.runner import run_evaluation
+    from src.reporting import generate_leaderboard
+    run_evaluation(run_id=args.resume, new_run_id=args.run_id)
     generate_leaderboard()
 
 if __name__ == "__main__":
@@ -8,19 +8,29 @@ Based on the original LogicKor evaluation methodology.
 
 import os
 import re
-import json
-import time
+import glob
+import argparse
+import threading
 import pandas as pd
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from tqdm import tqdm
 
 load_dotenv()
 
+import config
+from src.models import MLApiModel
+from src.evaluation.samples import row_prompt
+
 # Judge model configuration (using GPT-5.2 via mlapi.run)
-JUDGE_UUID = "664ce153-d45c-42a7-903c-d9119cc55b69"
-JUDGE_MODEL = "openai/gpt-5.2"
-API_KEY = os.getenv("ELICE_API_KEY")
+# Requests go through the shared client (pooled connections, adaptive rate limiting
+# with 429/5xx backoff). Unlike evaluation runs, judging uses the response cache by
+# default (JUDGE_CACHE_MODE), so a judgement is keyed by the judge model and the
+# rendered judge prompt (question + response + template) and never requested twice.
+JUDGE_MODEL = "gpt-5.2"
+JUDGE_WORKERS = 8       # Concurrent judge requests
+JUDGE_CACHE_MODE = "use"  # Response cache mode for judging: "use", "refresh" or "bypass"
+CHECKPOINT_EVERY = 20   # Write the partial _scored.csv every N judgements
 
 # LogicKor categories
 CATEGORIES = {
@@ -56,38 +66,28 @@ JUDGE_PROMPT = """당신은 한국어 AI 응답의 품질을 평가하는 전문
 이유: [한 문장으로 간단한 평가 이유]
 """
 
-def call_judge_api(question: str, response: str) -> dict:
-    """Call the judge model to score a response."""
-    url = f"https://mlapi.run/{JUDGE_UUID}/v1/chat/completions"
+_judge = None
+_judge_lock = threading.Lock()
 
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json"
-    }
 
-    prompt = JUDGE_PROMPT.format(question=question, response=response)
+def get_judge():
+    global _judge
+    with _judge_lock:
+        if _judge is None:
+            _judge = MLApiModel(JUDGE_MODEL)
+            _judge.client.timeout = 60
+        return _judge
 
-    payload = {
-        "model": JUDGE_MODEL,
-        "messages": [
-            {"role": "user", "content": prompt}
-        ],
-        "max_completion_tokens": 200,
-        "temperature": 0.1  # Low temperature for consistent scoring
-    }
 
-    try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=60)
-        resp.raise_for_status()
-        result = resp.json()
-
-        if "choices" in result:
-            content = result["choices"][0]["message"].get("content", "")
-            return {"success": True, "content": content}
-        return {"success": False, "error": "No choices in response"}
+def call_judge_api(question: str, response: str) -> dict:
+    """Call the judge model to score a response."""
+    prompt = JUDGE_PROMPT.format(question=question, response=response)
 
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    # Low temperature for consistent scoring
+    content = get_judge().generate(prompt, max_tokens=200, temperature=0.1)
+    if content.startswith("Error:"):
+        return {"success": False, "error": content[len("Error:"):].strip()}
+    return {"success": True, "content": content}
 
 
 def extract_score(judge_response: str) -> int:
@@ -109,8 +109,25 @@ def extract_score(judge_response: str) -> int:
     return None
 
 
-def score_logickor_file(filepath: str, output_path: str = None):
-    """Score all responses in a LogicKor result file."""
+def _load_previous_scores(output_path):
+    """Returns {(question, prediction): (score, reason)} from a (partially) scored output."""
+    if not os.path.exists(output_path):
+        return {}
+    previous = pd.read_csv(output_path)
+    if 'judge_score' not in previous.columns:
+        return {}
+    done = previous[previous['judge_score'].notna()]
+    return {
+        (row_prompt(row), row['prediction']): (int(row['judge_score']), row['judge_reason'])
+        for _, row in done.iterrows()
+    }
+
+
+def score_logickor_file(filepath: str, output_path: str = None, workers: int = JUDGE_WORKERS):
+    """
+    Score all responses in a LogicKor result file.
+    Rows already scored in an existing output are kept; only the rest go to the judge.
+    """
     print(f"\nScoring: {filepath}")
 
     df = pd.read_csv(filepath)
@@ -125,30 +142,48 @@ def score_logickor_file(filepath: str, output_path: str = None):
         print("No valid responses to score.")
         return None
 
-    scores = []
-    reasons = []
+    if output_path is None:
+        output_path = filepath.replace('.csv', '_scored.csv')
 
-    for idx, row in tqdm(valid_df.iterrows(), total=len(valid_df), desc="Scoring"):
-        question = row['prompt']
-        response = row['prediction']
+    previous = _load_previous_scores(output_path)
+    # Result files reference their questions by sample_id; older ones still carry the prompt
+    questions = [row_prompt(row) for _, row in valid_df.iterrows()]
+    responses = valid_df['prediction'].tolist()
+    scores = [None] * len(valid_df)
+    reasons = [None] * len(valid_df)
+    pending = []
+    for i, (question, response) in enumerate(zip(questions, responses)):
+        if (question, response) in previous:
+            scores[i], reasons[i] = previous[(question, response)]
+        else:
+            pending.append(i)
 
-        # Call judge
-        result = call_judge_api(question, response)
+    if len(pending) < len(valid_df):
+        print(f"Resuming: {len(valid_df) - len(pending)} responses already scored")
 
-        if result['success']:
-            score = extract_score(result['content'])
-            scores.append(score)
-            reasons.append(result['content'])
-        else:
-            scores.append(None)
-            reasons.append(f"Error: {result['error']}")
+    def _save():
+        valid_df['judge_score'] = pd.array(scores, dtype="Int64")
+        valid_df['judge_reason'] = reasons
+        valid_df.to_csv(output_path, index=False)
 
-        # Rate limiting
-        time.sleep(1)
+    def _judge(i):
+        return i, call_judge_api(questions[i], responses[i])
 
-    # Add scores to dataframe
-    valid_df['judge_score'] = scores
-    valid_df['judge_reason'] = reasons
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_judge, i) for i in pending]
+            for n, future in enumerate(tqdm(as_completed(futures), total=len(futures), desc="Scoring"), 1):
+                i, result = future.result()
+                if result['success']:
+                    scores[i] = extract_score(result['content'])
+                    reasons[i] = result['content']
+                else:
+                    reasons[i] = f"Error: {result['error']}"
+                if n % CHECKPOINT_EVERY == 0:
+                    _save()
+    finally:
+        # Keep whatever was judged so an interrupted run can resume from it
+        _save()
 
     # Calculate statistics
     valid_scores = [s for s in scores if s is not None]
@@ -163,11 +198,6 @@ def score_logickor_file(filepath: str, output_path: str = None):
         dist = {i: valid_scores.count(i) for i in range(1, 6)}
         print(f"  Distribution: {dist}")
 
-    # Save results
-    if output_path is None:
-        output_path = filepath.replace('.csv', '_scored.csv')
-
-    valid_df.to_csv(output_path, index=False)
     print(f"Saved to: {output_path}")
 
     return {
@@ -182,22 +212,26 @@ def score_logickor_file(filepath: str, output_path: str = None):
 
 def main():
     """Score all LogicKor result files."""
+    parser = argparse.ArgumentParser(description="LogicKor LLM Judge Scoring")
+    parser.add_argument("files", nargs="*", help="LogicKor result CSVs (default: all in results/)")
+    parser.add_argument("--workers", type=int, default=JUDGE_WORKERS, help="Concurrent judge requests")
+    parser.add_argument("--cache", choices=["use", "refresh", "bypass"], default=JUDGE_CACHE_MODE,
+                        help=f"Response cache mode for judgements (default: {JUDGE_CACHE_MODE})")
+    args = parser.parse_args()
+    config.CACHE_MODE = args.cache
+
     print("=" * 60)
     print("LogicKor LLM Judge Scoring")
     print("=" * 60)
 
     # Find LogicKor files
-    result_files = [
-        'results/20260118_175403_helpy-pro_logickor.csv',
-        'results/20260118_175403_gpt-oss-20b_logickor.csv',
-        'results/20260118_175403_gpt-5.2_logickor.csv',
-    ]
+    result_files = args.files or sorted(glob.glob(os.path.join(config.RESULTS_DIR, "*_logickor.csv")))
 
     all_results = []
 
     for filepath in result_files:
         if os.path.exists(filepath):
-            result = score_logickor_file(filepath)
+            result = score_logickor_file(filepath, workers=args.workers)
             if result:
                 all_results.append(result)
         else:
@@ -1,7 +1,9 @@
 
-from datasets import load_dataset
+from .snapshot import load_source
 from .utils import sample_dataset
 
+DATASET = "HAERAE-HUB/HAE_RAE_BENCH_1.1"
+
 TASKS = [
     'correct_definition_matching', 'csat_geo', 'csat_law', 'csat_socio', 
     'date_understanding', 'general_knowledge', 'history', 'loan_words', 
@@ -9,9 +11,9 @@ TASKS = [
     'standard_nomenclature', 'reading_comprehension'
 ]
 
-def load_haerae(task, sample_size=None, seed=42):
+def load_haerae(task, sample_size=None, seed=42, split=None):
     if task not in TASKS:
         raise ValueError(f"HAE-RAE task must be one of {TASKS}")
     
-    ds = load_dataset("HAERAE-HUB/HAE_RAE_BENCH_1.1", task)
-    return sample_dataset(ds, sample_size, seed)
+    ds = load_source(DATASET, task)
+    return sample_dataset(ds, sample_size, seed, split=split, manifest_key=f"{DATASET}/{task}")
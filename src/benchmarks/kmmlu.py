@@ -1,7 +1,9 @@
 
-from datasets import load_dataset
+from .snapshot import load_source
 from .utils import sample_dataset
 
+DATASET = "HAERAE-HUB/KMMLU"
+
 # Full list of KMMLU categories
 CATEGORIES = [
     'Accounting', 'Agricultural-Sciences', 'Aviation-Engineering-and-Maintenance', 
@@ -24,6 +26,6 @@ CATEGORIES = [
 # HuggingFace usually allows loading "all" or we iterate. 
 # For KMMLU, typically we load specific configs.
 
-def load_kmmlu(category, sample_size=None, seed=42):
-    ds = load_dataset("HAERAE-HUB/KMMLU", category)
-    return sample_dataset(ds, sample_size, seed)
+def load_kmmlu(category, sample_size=None, seed=42, split=None):
+    ds = load_source(DATASET, category)
+    return sample_dataset(ds, sample_size, seed, split=split, manifest_key=f"{DATASET}/{category}")
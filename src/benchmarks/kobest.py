@@ -1,12 +1,14 @@
 
-from datasets import load_dataset
+from .snapshot import load_source
 from .utils import sample_dataset
 
+DATASET = "skt/kobest_v1"
+
 TASKS = ['boolq', 'copa', 'hellaswag', 'sentineg', 'wic']
 
-def load_kobest(task, sample_size=None, seed=42):
+def load_kobest(task, sample_size=None, seed=42, split=None):
     if task not in TASKS:
         raise ValueError(f"KoBEST task must be one of {TASKS}")
     
-    ds = load_dataset("skt/kobest_v1", task)
-    return sample_dataset(ds, sample_size, seed)
+    ds = load_source(DATASET, task)
+    return sample_dataset(ds, sample_size, seed, split=split, manifest_key=f"{DATASET}/{task}")
@@ -1,7 +1,9 @@
 
-from datasets import load_dataset
+from .snapshot import load_source
 from .utils import sample_dataset
 
-def load_logickor(sample_size=None, seed=42):
-    ds = load_dataset("maywell/LogicKor")
-    return sample_dataset(ds, sample_size, seed)
+DATASET = "maywell/LogicKor"
+
+def load_logickor(sample_size=None, seed=42, split=None):
+    ds = load_source(DATASET)
+    return sample_dataset(ds, sample_size, seed, split=split, manifest_key=DATASET)
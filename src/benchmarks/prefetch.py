@@ -0,0 +1,39 @@
+
+import config
+from . import kobest, kmmlu, haerae, logickor
+from .snapshot import snapshot, MANIFEST_NAME
+
+def benchmark_configs(benchmarks=None):
+    """Lists the (dataset, config) pairs needed by the given benchmarks."""
+    benchmarks = benchmarks or config.ENABLED_BENCHMARKS
+    configs = []
+    if "kobest" in benchmarks:
+        configs += [(kobest.DATASET, task) for task in kobest.TASKS]
+    if "kmmlu" in benchmarks:
+        configs += [(kmmlu.DATASET, cat) for cat in kmmlu.CATEGORIES]
+    if "haerae" in benchmarks:
+        configs += [(haerae.DATASET, task) for task in haerae.TASKS]
+    if "logickor" in benchmarks:
+        configs.append((logickor.DATASET, None))
+    return configs
+
+def prefetch(benchmarks=None, force=False):
+    """
+    Materialises every config and split of the enabled benchmarks into the local snapshot store.
+    Loaders read from the snapshot afterwards without touching the Hub.
+    """
+    configs = benchmark_configs(benchmarks)
+    print(f"Prefetching {len(configs)} dataset configs into {config.SNAPSHOT_DIR}...")
+
+    failed = []
+    for path, name in configs:
+        try:
+            entry = snapshot(path, name, force=force)
+            splits = ", ".join(f"{split}={rows}" for split, rows in (entry or {}).get("splits", {}).items())
+            print(f"  {path} ({name or 'default'}): {splits}")
+        except Exception as e:
+            print(f"  ! Failed to snapshot {path} ({name or 'default'}): {e}")
+            failed.append((path, name))
+
+    print(f"Snapshot manifest: {config.SNAPSHOT_DIR}/{MANIFEST_NAME}")
+    return failed
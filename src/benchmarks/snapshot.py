@@ -0,0 +1,83 @@
+
+import os
+import json
+import threading
+from datetime import datetime
+import config
+
+MANIFEST_NAME = "manifest.json"
+
+_manifest_lock = threading.Lock()
+
+
+def snapshot_path(path, name=None):
+    """Local directory of the snapshot for a Hub dataset config."""
+    return os.path.join(config.SNAPSHOT_DIR, path.replace("/", "__"), name or "default")
+
+
+def has_snapshot(path, name=None):
+    return os.path.exists(os.path.join(snapshot_path(path, name), "dataset_dict.json"))
+
+
+def load_source(path, name=None):
+    """
+    Loads a dataset config from its local snapshot (memory-mapped Arrow, no Hub access)
+    when one exists, otherwise from the Hub.
+    """
+    # datasets is imported here rather than at module level: it takes seconds to import
+    from datasets import load_dataset, load_from_disk
+    if has_snapshot(path, name):
+        return load_from_disk(snapshot_path(path, name))
+    if config.OFFLINE_DATA:
+        raise FileNotFoundError(
+            f"No snapshot for {path} ({name or 'default'}) in {config.SNAPSHOT_DIR}. "
+            f"Run `python main.py --prefetch` on a machine with Hub access."
+        )
+    return load_dataset(path, name)
+
+
+def read_manifest():
+    manifest_path = os.path.join(config.SNAPSHOT_DIR, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(manifest):
+    manifest_path = os.path.join(config.SNAPSHOT_DIR, MANIFEST_NAME)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def snapshot(path, name=None, force=False):
+    """
+    Downloads every split of a Hub dataset config and saves it as a local Arrow snapshot.
+
+    Returns:
+        Manifest entry describing the snapshot
+    """
+    from datasets import load_dataset
+    key = f"{path}/{name or 'default'}"
+    if has_snapshot(path, name) and not force:
+        return read_manifest().get(key)
+
+    ds = load_dataset(path, name)
+    local = snapshot_path(path, name)
+    ds.save_to_disk(local)
+
+    entry = {
+        "dataset": path,
+        "config": name,
+        "path": local,
+        "splits": {split: ds[split].num_rows for split in ds},
+        "fingerprints": {split: ds[split]._fingerprint for split in ds},
+        "created_at": datetime.now().isoformat(timespec="seconds")
+    }
+    with _manifest_lock:
+        manifest = read_manifest()
+        manifest[key] = entry
+        _write_manifest(manifest)
+    return entry
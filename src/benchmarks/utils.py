@@ -1,41 +1,98 @@
 
-import random
-from datasets import Dataset, DatasetDict
+import os
+import json
+import numpy as np
+import config
 
-def sample_dataset(dataset, sample_size=None, seed=42):
+# Column added to sampled datasets: "<dataset>/<config>:<split>:<row>", where row is the
+# index in the full split (see src/evaluation/samples.py)
+SOURCE_COLUMN = "sample_source"
+
+def _manifest_path(manifest_key, split, n, seed):
+    name = f"{manifest_key}/{split}".replace("/", "__")
+    return os.path.join(config.SAMPLING_DIR, f"{name}__n{n}__seed{seed}.json")
+
+def sample_indices(total_rows, n, seed=42, manifest_key=None, split=None):
+    """
+    Draws n distinct row indices out of total_rows with a seeded NumPy generator
+    (no full shuffle). Indices are sorted so the selection reads the Arrow table in order.
+
+    When manifest_key is given, the indices are persisted as a sampling manifest and
+    reused by later calls with the same key, split, size and seed.
+    """
+    path = _manifest_path(manifest_key, split, n, seed) if manifest_key else None
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["total_rows"] == total_rows:
+            return manifest["indices"]
+
+    rng = np.random.default_rng(seed)
+    indices = np.sort(rng.choice(total_rows, size=n, replace=False)).tolist()
+
+    if path:
+        os.makedirs(config.SAMPLING_DIR, exist_ok=True)
+        manifest = {
+            "key": manifest_key,
+            "split": split,
+            "total_rows": total_rows,
+            "sample_size": n,
+            "seed": seed,
+            "indices": indices
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+    return indices
+
+def sample_dataset(dataset, sample_size=None, seed=42, split=None, manifest_key=None):
     """
     Samples from a dataset or dataset dict.
-    
+
     Args:
         dataset: HuggingFace Dataset or DatasetDict
         sample_size: int (number of samples) or float (fraction) or None (no sampling)
         seed: random seed
-        
+        split: for a DatasetDict, the split to sample (or a list of candidates, first present wins).
+               Only that split is touched and it is returned as a Dataset.
+               Without it every split is sampled.
+        manifest_key: dataset identifier under which the sampled indices are persisted;
+                      also the source recorded in each row's SOURCE_COLUMN
+
     Returns:
         Sampled dataset
     """
-    if sample_size is None:
-        return dataset
-
+    from datasets import DatasetDict
     if isinstance(dataset, DatasetDict):
+        if split is not None:
+            candidates = [split] if isinstance(split, str) else list(split)
+            for name in candidates:
+                if name in dataset:
+                    return sample_dataset(dataset[name], sample_size, seed, split=name, manifest_key=manifest_key)
+            raise KeyError(f"None of the splits {candidates} found; available: {list(dataset.keys())}")
+
+        if sample_size is None:
+            return dataset
+
         sampled_dict = DatasetDict()
-        for split in dataset.keys():
-            sampled_dict[split] = sample_dataset(dataset[split], sample_size, seed)
+        for name in dataset.keys():
+            sampled_dict[name] = sample_dataset(dataset[name], sample_size, seed, split=name, manifest_key=manifest_key)
         return sampled_dict
 
     # It's a Dataset
     total_rows = len(dataset)
-    if isinstance(sample_size, float):
-        n = int(total_rows * sample_size)
-    else:
-        n = min(sample_size, total_rows)
-        
-    if n >= total_rows:
-        return dataset
-        
-    indices = list(range(total_rows))
-    random.seed(seed)
-    random.shuffle(indices)
-    sampled_indices = indices[:n]
-    
-    return dataset.select(sampled_indices)
+    indices = None
+    if sample_size is not None:
+        if isinstance(sample_size, float):
+            n = int(total_rows * sample_size)
+        else:
+            n = min(sample_size, total_rows)
+        if n < total_rows:
+            indices = sample_indices(total_rows, n, seed, manifest_key, split)
+            dataset = dataset.select(indices)
+
+    if manifest_key and split:
+        rows = indices if indices is not None else range(total_rows)
+        dataset = dataset.add_column(SOURCE_COLUMN, [f"{manifest_key}:{split}:{row}" for row in rows])
+    return dataset
@@ -1,2 +1,7 @@
 
-from .runner import run_evaluation
+def __getattr__(name):
+    # Imported on first use: the runner pulls in pandas, datasets and the model clients
+    if name == "run_evaluation":
+        from .runner import run_evaluation
+        return run_evaluation
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,298 @@
+
+import os
+import json
+import time
+from datetime import datetime
+import config
+from src.models.client import parse_chat_result
+from src.evaluation.engine import generate_all
+from src.evaluation.journal import RunJournal, get_run_dir, save_run_config, load_run_config
+from src.evaluation.runner import get_model, get_concurrency, build_result, save_task_results
+from src.evaluation.scheduler import build_plan
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+MISSING_PREDICTION = "Error: missing from batch output"
+
+
+def make_custom_id(model_name, task_name, index):
+    """Stable request id: the same run plan always yields the same ids."""
+    return f"{model_name}|{task_name}|{index}"
+
+
+def parse_custom_id(custom_id):
+    model_name, task_name, index = custom_id.split("|")
+    return model_name, task_name, int(index)
+
+
+def get_batch_dir(run_id, results_dir=None):
+    return os.path.join(get_run_dir(run_id, results_dir), "batch")
+
+
+def _state_path(run_id):
+    return os.path.join(get_batch_dir(run_id), "state.json")
+
+
+def _load_state(run_id):
+    path = _state_path(run_id)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No batch export for run {run_id} ({path})")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(run_id, state):
+    path = _state_path(run_id)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _output_paths(run_id, part_name):
+    stem = os.path.join(get_batch_dir(run_id), part_name[:-len(".jsonl")])
+    return f"{stem}.output.jsonl", f"{stem}.errors.jsonl"
+
+
+def _init_models():
+    models = []
+    for model_name in config.ENABLED_MODELS:
+        try:
+            models.append(get_model(model_name))
+        except Exception as e:
+            print(f"Failed to initialize {model_name}: {e}")
+    return models
+
+
+def _batch_kwargs(spec):
+    # Batch jobs return whole responses; streaming and early stop do not apply
+    return {key: value for key, value in spec.generation_kwargs.items() if key not in ("stream", "stop_when")}
+
+
+class _PartWriter:
+    """Writes one model's requests into input files of at most BATCH_MAX_REQUESTS lines."""
+
+    def __init__(self, batch_dir, model_name):
+        self.batch_dir = batch_dir
+        self.model_name = model_name
+        self.parts = {}
+        self._name = None
+        self._file = None
+
+    def write(self, request):
+        if self._file is None or self.parts[self._name] >= config.BATCH_MAX_REQUESTS:
+            self.close()
+            self._name = f"{self.model_name}_{len(self.parts):03d}.jsonl"
+            self.parts[self._name] = 0
+            self._file = open(os.path.join(self.batch_dir, self._name), "w", encoding="utf-8")
+        self._file.write(json.dumps(request, ensure_ascii=False) + "\n")
+        self.parts[self._name] += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def export_batch(run_id=None):
+    """
+    Compiles the full (model, task, sample) plan into OpenAI batch request files
+    under results/runs/<run_id>/batch/.
+
+    Returns:
+        The run id
+    """
+    run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    batch_dir = get_batch_dir(run_id)
+    os.makedirs(batch_dir, exist_ok=True)
+    save_run_config(run_id)
+
+    models = []
+    for model in _init_models():
+        try:
+            model.batch_request("")
+            models.append(model)
+        except NotImplementedError as e:
+            print(f"Skipping {model.model_name}: {e}")
+    if not models:
+        print("No batch-capable models initialized. Exiting.")
+        return run_id
+
+    writers = {model.model_name: _PartWriter(batch_dir, model.model_name) for model in models}
+    try:
+        for spec in build_plan():
+            try:
+                dataset = spec.load()
+            except Exception as e:
+                print(f"Error loading {spec.task_name}: {e}")
+                continue
+            prompts = [spec.prompt_func(sample) for sample in dataset]
+            for model in models:
+                for i, prompt in enumerate(prompts):
+                    writers[model.model_name].write({
+                        "custom_id": make_custom_id(model.model_name, spec.task_name, i),
+                        "method": "POST",
+                        "url": BATCH_ENDPOINT,
+                        "body": model.batch_request(prompt, **_batch_kwargs(spec))
+                    })
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    state = {"run_id": run_id, "parts": {}}
+    for model_name, writer in writers.items():
+        for name, count in writer.parts.items():
+            state["parts"][name] = {"model": model_name, "requests": count, "status": "exported"}
+    _save_state(run_id, state)
+
+    total = sum(part["requests"] for part in state["parts"].values())
+    print(f"Exported {total} requests in {len(state['parts'])} batch files to {batch_dir} (run {run_id})")
+    return run_id
+
+
+def _run_local(model, input_path, output_path):
+    """Local stand-in for a batch endpoint: replays the request file against the chat endpoint."""
+    with open(input_path, encoding="utf-8") as f:
+        requests = [json.loads(line) for line in f]
+
+    def _execute(request):
+        try:
+            body = model.client.post(model.client.chat_url, request["body"])
+            return {"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}, "error": None}
+        except Exception as e:
+            return {"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}}
+
+    outputs = generate_all(model, requests, get_concurrency(model.model_name),
+                           desc=f"{model.model_name} local batch", request=_execute)
+    with open(output_path, "w", encoding="utf-8") as f:
+        for output in outputs:
+            f.write(json.dumps(output, ensure_ascii=False) + "\n")
+
+
+def submit_batch(run_id):
+    """Submits every exported batch file that has not been submitted yet."""
+    load_run_config(run_id)
+    state = _load_state(run_id)
+    models = {model.model_name: model for model in _init_models()}
+
+    for name, part in state["parts"].items():
+        if part["status"] != "exported":
+            continue
+        model = models.get(part["model"])
+        if model is None:
+            print(f"Skipping {name}: model {part['model']} not initialized")
+            continue
+        input_path = os.path.join(get_batch_dir(run_id), name)
+        try:
+            if config.BATCH_MODE == "local":
+                _run_local(model, input_path, _output_paths(run_id, name)[0])
+                part.update(status="completed", batch_id=None)
+            else:
+                file_id = model.client.upload_batch_file(input_path)
+                batch = model.client.create_batch(file_id, BATCH_ENDPOINT)
+                part.update(status=batch["status"], batch_id=batch["id"], input_file_id=file_id)
+            print(f"Submitted {name} ({part['requests']} requests): {part['status']}")
+        except Exception as e:
+            print(f"Error submitting {name}: {e}")
+        _save_state(run_id, state)
+
+
+def poll_batches(run_id, interval=None):
+    """Polls submitted batches until all are finished, downloading their output files."""
+    interval = config.BATCH_POLL_INTERVAL if interval is None else interval
+    load_run_config(run_id)
+    state = _load_state(run_id)
+    models = {model.model_name: model for model in _init_models()}
+
+    while True:
+        pending = {name: part for name, part in state["parts"].items()
+                   if part.get("batch_id") and part["status"] not in TERMINAL_STATUSES}
+        for name, part in pending.items():
+            client = models[part["model"]].client
+            try:
+                batch = client.get_batch(part["batch_id"])
+                if batch["status"] in TERMINAL_STATUSES:
+                    output_path, errors_path = _output_paths(run_id, name)
+                    if batch.get("output_file_id"):
+                        client.download_file(batch["output_file_id"], output_path)
+                    if batch.get("error_file_id"):
+                        client.download_file(batch["error_file_id"], errors_path)
+                part["status"] = batch["status"]
+                part["request_counts"] = batch.get("request_counts")
+            except Exception as e:
+                print(f"Error polling {name}: {e}")
+        _save_state(run_id, state)
+
+        statuses = [part["status"] for part in state["parts"].values()]
+        print("Batch status: " + ", ".join(f"{status}={statuses.count(status)}" for status in sorted(set(statuses))))
+        if not pending or all(part["status"] in TERMINAL_STATUSES for part in pending.values()):
+            return state
+        time.sleep(interval)
+
+
+def _prediction(record):
+    response = record.get("response")
+    if response and response.get("status_code") == 200:
+        return parse_chat_result(response["body"])
+    error = record.get("error") or ((response or {}).get("body") or {}).get("error") or response
+    if isinstance(error, dict):
+        error = error.get("message", error)
+    return f"Error: {error}"
+
+
+def ingest_batch(run_id):
+    """
+    Turns downloaded batch outputs into the normal per-task result files.
+    Successful samples are also recorded in the run journal, so
+    `main.py --resume <run_id>` re-requests only what the batch did not answer.
+    """
+    load_run_config(run_id)
+    state = _load_state(run_id)
+
+    predictions = {}
+    for name in state["parts"]:
+        for path in _output_paths(run_id, name):
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    model_name, task_name, i = parse_custom_id(record["custom_id"])
+                    predictions.setdefault((model_name, task_name), {})[i] = _prediction(record)
+
+    models = _init_models()
+    journal = RunJournal(run_id)
+    try:
+        for spec in build_plan():
+            task_models = [model for model in models if (model.model_name, spec.task_name) in predictions]
+            if not task_models:
+                continue
+            samples = list(spec.load())
+            for model in task_models:
+                outputs = predictions[(model.model_name, spec.task_name)]
+                results = []
+                for i, sample in enumerate(samples):
+                    result = build_result(model, spec.task_name, sample, outputs.get(i, MISSING_PREDICTION), sample_index=i)
+                    if not result["prediction"].startswith("Error:"):
+                        journal.record(model.model_name, spec.task_name, i, result)
+                    results.append(result)
+                failed = sum(result["prediction"].startswith("Error:") for result in results)
+                print(f"{model.model_name} {spec.task_name}: {len(results) - failed} answered, {failed} failed")
+                save_task_results(model.model_name, spec, results, run_id)
+    finally:
+        journal.close()
+    print(f"Ingested batch results for run {run_id}. `python main.py --resume {run_id}` re-requests failed samples.")
+
+
+def run_batch(action, run_id=None):
+    """Entry point for main.py --batch: export, submit, poll, ingest, or all four in order."""
+    if action in ("export", "all"):
+        run_id = export_batch(run_id)
+    if not run_id:
+        raise ValueError(f"--batch {action} needs --run-id")
+    if action in ("submit", "all"):
+        submit_batch(run_id)
+    if action in ("poll", "all"):
+        poll_batches(run_id)
+    if action in ("ingest", "all"):
+        ingest_batch(run_id)
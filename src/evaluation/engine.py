@@ -0,0 +1,57 @@
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from tqdm import tqdm
+
+async def _generate_concurrently(model, prompts, concurrency, progress, on_result, request, **kwargs):
+    # asyncio.to_thread uses the default executor, which is capped at a few dozen threads.
+    # Size it to the in-flight limit so the semaphore is the only bound.
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _generate_one(i, prompt):
+        async with semaphore:
+            if request is None:
+                prediction = await model.agenerate(prompt, **kwargs)
+            else:
+                prediction = await asyncio.to_thread(request, prompt, **kwargs)
+        if on_result:
+            on_result(i, prediction)
+        progress.update(1)
+        return prediction
+
+    # gather() preserves input order regardless of completion order
+    return await asyncio.gather(*(_generate_one(i, prompt) for i, prompt in enumerate(prompts)))
+
+def generate_all(model, prompts, concurrency=1, on_result=None, desc=None, request=None, show_progress=True, **kwargs):
+    """
+    Generates a prediction for every prompt.
+    
+    Args:
+        model: BaseModel instance
+        prompts: list of prompt strings
+        concurrency: maximum number of requests in flight (1 = sequential)
+        on_result: optional callback(i, prediction) invoked as each prompt completes
+        desc: progress bar label
+        show_progress: False hides the progress bar (e.g. for the small batches of queue workers)
+        request: callable(prompt, **kwargs) to use instead of model.generate
+                 (e.g. a bound score_options call)
+        kwargs: generation parameters passed to model.generate
+        
+    Returns:
+        List of predictions in the same order as prompts
+    """
+    with tqdm(total=len(prompts), desc=desc or model.model_name, disable=not show_progress) as progress:
+        if concurrency <= 1:
+            predictions = []
+            for i, prompt in enumerate(prompts):
+                prediction = (request or model.generate)(prompt, **kwargs)
+                if on_result:
+                    on_result(i, prediction)
+                predictions.append(prediction)
+                progress.update(1)
+            return predictions
+
+        return asyncio.run(_generate_concurrently(model, prompts, concurrency, progress, on_result, request, **kwargs))
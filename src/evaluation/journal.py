@@ -0,0 +1,112 @@
+
+import os
+import json
+import time
+import threading
+import config
+
+RUN_CONFIG_KEYS = ["SAMPLE_SIZE", "SEED", "ENABLED_MODELS", "ENABLED_BENCHMARKS", "EVAL_MODE", "PACK_SIZE", "SHARD", "QUEUE_MODE"]
+
+
+def get_run_dir(run_id, results_dir=None):
+    return os.path.join(results_dir or config.RESULTS_DIR, "runs", run_id)
+
+
+def save_run_config(run_id, results_dir=None):
+    """Records the settings that determine a run's work plan so a resume can restore them."""
+    path = os.path.join(get_run_dir(run_id, results_dir), "run.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({key: getattr(config, key) for key in RUN_CONFIG_KEYS}, f, ensure_ascii=False, indent=2)
+
+
+def read_run_config(run_id, results_dir=None):
+    """Returns the settings saved by save_run_config, or None for runs without them."""
+    path = os.path.join(get_run_dir(run_id, results_dir), "run.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_run_config(run_id, results_dir=None):
+    """Restores the settings saved by save_run_config into the config module."""
+    saved = read_run_config(run_id, results_dir)
+    if saved is None:
+        raise FileNotFoundError(f"No run found for run id {run_id} ({os.path.join(get_run_dir(run_id, results_dir), 'run.json')})")
+    for key, value in saved.items():
+        setattr(config, key, value)
+
+
+class RunJournal:
+    """
+    Append-only JSONL log of completed samples for one run.
+
+    Every completed sample is written and flushed immediately; fsync is batched
+    (every `fsync_every` records or `fsync_interval` seconds) to keep the cost low.
+    """
+
+    def __init__(self, run_id, results_dir=None, fsync_every=20, fsync_interval=2.0):
+        self.run_id = run_id
+        self.path = os.path.join(get_run_dir(run_id, results_dir), "journal.jsonl")
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._completed = {}
+        self._pending_sync = 0
+        self._last_sync = time.time()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            end = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A crash can leave a partially written last line; cut it off so the
+                    # next record starts on a line of its own
+                    f.truncate(end)
+                    break
+                end += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                key = (record["model"], record["task"])
+                self._completed.setdefault(key, {})[record["index"]] = record["result"]
+
+    def completed(self, model_name, task_name):
+        """Returns {sample index: result row} for samples already done in this run."""
+        with self._lock:
+            return dict(self._completed.get((model_name, task_name), {}))
+
+    def record(self, model_name, task_name, index, result):
+        line = json.dumps(
+            {"model": model_name, "task": task_name, "index": index, "result": result},
+            ensure_ascii=False
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._completed.setdefault((model_name, task_name), {})[index] = result
+            self._pending_sync += 1
+            if self._pending_sync >= self.fsync_every or time.time() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._pending_sync = 0
+        self._last_sync = time.time()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            self._sync()
+            self._file.close()
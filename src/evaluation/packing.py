@@ -0,0 +1,95 @@
+
+import re
+import json
+from src.evaluation.engine import generate_all
+
+PACKED_HEADER = "다음 {count}개의 문제에 각각 답하세요.\n\n"
+PACKED_FOOTER = (
+    "\n\n풀이 없이 각 문제의 정답(선택지 번호 또는 기호)만 문제 순서대로 아래 JSON 형식으로 답하세요.\n"
+    '{{"answers": [{example}]}}'
+)
+
+# Fallback for responses that list answers instead of returning JSON, e.g. "문제 2: B"
+_NUMBERED_ANSWER = re.compile(r'(?:문제\s*)?(\d+)\s*[:.)]\s*\**\(?([1-5A-E])\)?\**', re.IGNORECASE)
+_JSON_OBJECT = re.compile(r'\{.*\}', re.DOTALL)
+MAX_ANSWER_LENGTH = 20
+
+
+def build_packed_prompt(prompts):
+    """Joins several single-question prompts (format_kmmlu, format_haerae, ...) into one request."""
+    blocks = [f"### 문제 {k}\n{prompt}" for k, prompt in enumerate(prompts, 1)]
+    example = ", ".join(f'"정답{k}"' for k in range(1, len(prompts) + 1))
+    return PACKED_HEADER.format(count=len(prompts)) + "\n\n".join(blocks) + PACKED_FOOTER.format(example=example)
+
+
+def parse_packed_response(text, count):
+    """
+    Splits a packed response back into per-question answers.
+
+    Returns:
+        list of length count; None where the answer could not be parsed
+    """
+    answers = [None] * count
+    if not text or text.startswith("Error:"):
+        return answers
+
+    match = _JSON_OBJECT.search(text)
+    if match:
+        try:
+            parsed = json.loads(match.group(0)).get("answers")
+        except (json.JSONDecodeError, AttributeError):
+            parsed = None
+        if isinstance(parsed, list) and len(parsed) == count:
+            for k, answer in enumerate(parsed):
+                answer = "" if answer is None else str(answer).strip()
+                if answer and len(answer) <= MAX_ANSWER_LENGTH:
+                    answers[k] = answer
+            return answers
+
+    for match in _NUMBERED_ANSWER.finditer(text):
+        k = int(match.group(1)) - 1
+        if 0 <= k < count and answers[k] is None:
+            answers[k] = match.group(2).upper()
+    return answers
+
+
+def generate_packed(model, prompts, pack_size, concurrency=1, on_result=None, desc=None, show_progress=True, **kwargs):
+    """
+    Answers prompts pack_size at a time, then re-issues any item whose answer could not
+    be parsed from the packed response as a normal single-question request.
+
+    Args:
+        on_result: optional callback(i, prediction, packed) invoked as each prompt is resolved
+        kwargs: generation parameters for the single-question re-issues
+
+    Returns:
+        List of predictions in the same order as prompts
+    """
+    groups = [list(range(start, min(start + pack_size, len(prompts)))) for start in range(0, len(prompts), pack_size)]
+    predictions = [None] * len(prompts)
+    retry = []
+
+    def _resolve(i, prediction, packed):
+        predictions[i] = prediction
+        if on_result:
+            on_result(i, prediction, packed)
+
+    def _on_group(g, response):
+        for i, answer in zip(groups[g], parse_packed_response(response, len(groups[g]))):
+            if answer is None:
+                retry.append(i)
+            else:
+                _resolve(i, answer, True)
+
+    # Packed requests run without streaming/early stop: the first "정답:" is only question 1
+    generate_all(model, [build_packed_prompt([prompts[i] for i in group]) for group in groups], concurrency,
+                 on_result=_on_group, desc=f"{desc or model.model_name} (packed x{pack_size})", show_progress=show_progress)
+
+    if retry:
+        retry.sort()
+        print(f"Re-issuing {len(retry)} unparsed packed items one at a time")
+        generate_all(model, [prompts[i] for i in retry], concurrency,
+                     on_result=lambda j, prediction: _resolve(retry[j], prediction, False),
+                     desc=f"{desc or model.model_name} (re-issue)", show_progress=show_progress, **kwargs)
+
+    return predictions
@@ -1,3 +1,6 @@
+# Bump when a template changes: stored results record the version their prompts were built with
+TEMPLATE_VERSION = 1
+
 
 def format_kobest_boolq(sample):
     return f"지문: {sample['paragraph']}\n질문: {sample['question']}\n위 질문에 대한 답이 참(True)이면 1, 거짓(False)이면 0을 선택하세요.\n정답:"
@@ -37,3 +40,15 @@ def format_logickor(sample):
     if isinstance(questions, list) and len(questions) > 0:
         return questions[0] # Evaluate single turn for now or pass context
     return str(questions)
+
+def get_prompt_func(task_name):
+    """Returns the template used for a task name of the work plan (e.g. kobest_boolq, kmmlu_Law)."""
+    if task_name.startswith("kobest_"):
+        return globals()[f"format_{task_name}"]
+    if task_name.startswith("kmmlu_"):
+        return format_kmmlu
+    if task_name.startswith("haerae_"):
+        return format_haerae
+    if task_name == "logickor":
+        return format_logickor
+    raise ValueError(f"No prompt template for task {task_name}")
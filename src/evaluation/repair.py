@@ -0,0 +1,156 @@
+
+import json
+import time
+import pandas as pd
+import config
+from src.models.cache import get_cache
+from src.evaluation.engine import generate_all
+from src.evaluation.journal import RunJournal, load_run_config, read_run_config
+from src.evaluation.samples import row_prompt
+from src.evaluation.runner import get_model, get_concurrency
+from src.evaluation.scheduler import build_plan
+from src.evaluation.store import find_run_outputs, read_run_output, read_task_file, write_task_results
+
+def classify_failures(predictions):
+    """
+    Labels each prediction "error" (adapter returned "Error: ...") or "empty" (no content,
+    e.g. a reasoning model that spent max_tokens before answering); None for usable rows.
+    Answers the scoring engine cannot parse are left alone: results do not record whether a
+    response hit max_tokens, and re-rolling a valid short answer ("답은 0") would bias scores.
+    """
+    text = pd.Series(predictions).fillna("").astype(str).str.strip()
+    kinds = pd.Series([None] * len(text), index=text.index, dtype=object)
+    kinds[text == ""] = "empty"
+    kinds[text.str.startswith("Error:")] = "error"
+    return kinds
+
+
+def _write_output(run_id, model_name, task_name, output, df, repaired):
+    """
+    Writes repaired fields ({row position: {column: value}}) back into every configured
+    format. Existing files are updated in place; a format the run lacks (e.g. the Parquet
+    file of a run from before the store) is written from the repaired rows.
+    """
+    for fmt in config.RESULTS_FORMATS:
+        if output.get(fmt):
+            current = read_task_file(output[fmt]) if fmt == "parquet" else \
+                pd.read_csv(output[fmt], dtype=str, keep_default_na=False)
+        else:
+            current = df.copy()
+        if len(current) != len(df):
+            raise RuntimeError(f"{output[fmt]} has {len(current)} rows, expected {len(df)}; not repairing {model_name} {task_name}")
+        for pos, fields in repaired.items():
+            for column, value in fields.items():
+                current.loc[pos, column] = value
+        if fmt == "parquet":
+            write_task_results(run_id, model_name, output["benchmark"], task_name, current.to_dict("records"))
+        elif fmt == "csv":
+            current.to_csv(output.get("csv") or f"{config.RESULTS_DIR}/{run_id}_{model_name}_{task_name}.csv", index=False)
+        else:
+            raise ValueError(f"Unknown results format: {fmt}")
+
+
+def _reissue(model, spec, prompts):
+    """Re-asks prompts the way the runner would; returns a {column: value} update per prompt."""
+    concurrency = get_concurrency(model.model_name)
+    desc = f"repair {model.model_name} {spec.task_name}"
+    if spec.options and config.EVAL_MODE == "logprob" and model.supports_logprobs:
+        outputs = generate_all(model, prompts, concurrency, desc=desc,
+                               request=lambda prompt: model.score_options(prompt, spec.options))
+        return [{
+            "prediction": output["prediction"],
+            "option_probs": json.dumps({"distribution": output["distribution"], "top_logprobs": output["top_logprobs"]},
+                                       ensure_ascii=False)
+        } for output in outputs]
+    predictions = generate_all(model, prompts, concurrency, desc=desc, **spec.generation_kwargs)
+    return [{"prediction": prediction} for prediction in predictions]
+
+
+def repair_run(run_id):
+    """
+    Re-issues only the failed samples (errors and empty answers) of a finished (or
+    interrupted) run and merges the new predictions into its per-task outputs and journal. Samples that still fail are
+    retried for up to REPAIR_ATTEMPTS rounds.
+
+    Returns:
+        {"failed": n, "repaired": n, "remaining": n}
+    """
+    if read_run_config(run_id) is None:
+        # Runs from before run.json was recorded; their CSVs carry the prompts
+        print(f"Warning: no saved settings for run {run_id}, repairing with the current config")
+    else:
+        load_run_config(run_id)
+    # A cached response would just reproduce the empty answer
+    if config.CACHE_MODE == "use":
+        config.CACHE_MODE = "refresh"
+
+    specs = {spec.task_name: spec for spec in build_plan()}
+    outputs = find_run_outputs(run_id)
+    if not outputs:
+        print(f"No outputs found for run {run_id}")
+        return {"failed": 0, "repaired": 0, "remaining": 0}
+
+    # Collect failed rows per (model, task)
+    failures = {}
+    for (model_name, task_name), output in sorted(outputs.items()):
+        df = read_run_output(output)
+        kinds = classify_failures(df["prediction"])
+        failed = kinds[kinds.notna()]
+        if len(failed):
+            failures[(model_name, task_name)] = (df, failed)
+            print(f"{model_name} {task_name}: {len(failed)}/{len(df)} failed {failed.value_counts().to_dict()}")
+
+    total = sum(len(failed) for _, failed in failures.values())
+    print(f"Run {run_id}: {total} failed samples in {len(failures)} of {len(outputs)} task outputs")
+    if not total:
+        return {"failed": 0, "repaired": 0, "remaining": 0}
+
+    models = {}
+    journal = RunJournal(run_id)
+    repaired_total = 0
+    try:
+        for (model_name, task_name), (df, failed) in failures.items():
+            if model_name not in models:
+                try:
+                    models[model_name] = get_model(model_name)
+                except Exception as e:
+                    print(f"Failed to initialize {model_name}: {e}")
+                    models[model_name] = None
+            model = models[model_name]
+            spec = specs.get(task_name)
+            if model is None or spec is None:
+                continue
+
+            output = outputs[(model_name, task_name)]
+            pending = list(failed.index)
+            repaired = {}
+            for attempt in range(config.REPAIR_ATTEMPTS):
+                if attempt:
+                    time.sleep(min(5 * 2 ** (attempt - 1), 60))
+                    print(f"Retrying {len(pending)} samples of {model_name} {task_name} (attempt {attempt + 1})")
+                cache = get_cache()
+                if cache and cache.mode == "refresh":
+                    cache.restart_refresh()
+                updates = _reissue(model, spec, [row_prompt(df.loc[pos]) for pos in pending])
+                kinds = classify_failures(pd.Series([update["prediction"] for update in updates]))
+                for pos, update, kind in zip(pending, updates, kinds):
+                    if kind is None:
+                        repaired[pos] = update
+                pending = [pos for pos, kind in zip(pending, kinds) if kind is not None]
+                if not pending:
+                    break
+
+            if repaired:
+                _write_output(run_id, model_name, task_name, output, df, repaired)
+                for pos, update in repaired.items():
+                    row = {**df.loc[pos].to_dict(), "model": model_name, "benchmark": output["benchmark"],
+                           "task": task_name, **update}
+                    journal.record(model_name, task_name, int(row.get("sample_index", pos)), row)
+            repaired_total += len(repaired)
+            print(f"{model_name} {task_name}: repaired {len(repaired)}/{len(failed)}")
+    finally:
+        journal.close()
+
+    summary = {"failed": total, "repaired": repaired_total, "remaining": total - repaired_total}
+    print(f"Repair complete: {summary['repaired']}/{total} samples repaired, {summary['remaining']} still failing")
+    return summary
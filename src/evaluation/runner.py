@@ -2,80 +2,164 @@
 import os
 import json
 import pandas as pd
-from tqdm import tqdm
 from datetime import datetime
 import config
-from src.models import HelpyProModel, HelpyEduModel, MLApiModel, OpenAIModel
-from src.benchmarks import load_kobest, load_kmmlu, load_haerae, load_logickor
-from src.evaluation import metrics, prompts
+from src.models import get_model
+from src.models.client import print_connection_stats
+from src.models.cache import print_cache_stats
+from src.models.ratelimit import print_rate_limit_stats
+from src.models.hedging import print_hedging_stats
+from src.models.telemetry import export_telemetry, print_telemetry_summary
+from src.models.preflight import apply_preflight
+from src.evaluation import prompts
+from src.evaluation.scoring import accuracy
+from src.evaluation.samples import make_sample_id
+from src.evaluation.engine import generate_all
+from src.evaluation.packing import generate_packed
+from src.evaluation.journal import RunJournal, get_run_dir, save_run_config, load_run_config
+from src.evaluation.scheduler import build_plan, run_plan
+from src.evaluation.shard import in_shard
+from src.evaluation.workqueue import run_queue
+from src.evaluation.store import write_task_results
 
-def get_model(model_name):
-    if model_name == "helpy-pro":
-        return HelpyProModel(model_name)
-    elif model_name == "helpy-edu":
-        return HelpyEduModel(model_name)
-    elif model_name in ["gpt-oss-20b", "gpt-5.2"]:
-        return MLApiModel(model_name)
-    elif "gemini" in model_name:
-        raise ValueError(f"Gemini models are temporarily disabled: {model_name}")
-    else:
-        # Fallback to OpenAI for unknown models
-        return OpenAIModel(model_name)
+def get_concurrency(model_name):
+    return config.MODEL_CONCURRENCY.get(model_name, config.MAX_CONCURRENCY)
 
-def evaluate_task(model, task_name, dataset, prompt_func, metric_func=metrics.calculate_accuracy):
-    results = []
-    references = []
-    predictions = []
+def build_result(model, task_name, sample, prediction, **extra):
+    # Determine reference (ground truth)
+    # This varies by dataset. 
+    # KoBEST: label (0/1 or index)
+    # KMMLU: answer (A/B/C/D)
+    # Needs specific handling or consistent dataset formatting.
+    
+    reference = str(sample.get("label", sample.get("answer", "")))
     
-    print(f"Evaluating {model.model_name} on {task_name} ({len(dataset)} samples)...")
+    # Post-process prediction for metric
+    # e.g. extract "A" from "The answer is A"
+    # For numeric labels (KoBEST), we might need to map prediction to 0/1.
     
-    for i, sample in tqdm(enumerate(dataset), total=len(dataset)):
-        prompt = prompt_func(sample)
-        prediction = model.generate(prompt)
-        
-        # Determine reference (ground truth)
-        # This varies by dataset. 
-        # KoBEST: label (0/1 or index)
-        # KMMLU: answer (A/B/C/D)
-        # Needs specific handling or consistent dataset formatting.
-        
-        reference = str(sample.get("label", sample.get("answer", "")))
-        
-        # Post-process prediction for metric
-        # e.g. extract "A" from "The answer is A"
-        # For numeric labels (KoBEST), we might need to map prediction to 0/1.
-        
-        # For simplicity in this first pass, we store raw and let metric handle or refine later.
-        predictions.append(prediction)
-        references.append(reference)
-        
-        if metric_func:
-            # We assume metric_func calculates based on lists, but here we might want per-item scoring?
-            # For simplicity, we calculate global score later.
-            pass
+    # For simplicity in this first pass, we store raw and let metric handle or refine later.
+    # Prompt and sample are not stored: both are rebuilt from sample_id (see src/evaluation/samples.py)
+    return {
+        "model": model.model_name,
+        "benchmark": task_name.split("_")[0], # kobest, kmmlu, etc.
+        "task": task_name,
+        "sample_id": make_sample_id(sample),
+        "template_version": prompts.TEMPLATE_VERSION,
+        "prediction": prediction,
+        "reference": reference,
+        **extra
+    }
 
-        results.append({
-            "model": model.model_name,
-            "benchmark": task_name.split("_")[0], # kobest, kmmlu, etc.
-            "task": task_name,
-            "prompt": prompt,
-            "prediction": prediction,
-            "reference": reference,
-            "full_sample": str(sample)
-        })
-        
-        # Rate limiting or sleep could be added here
-        
-    # score = metric_func(predictions, references) # Deprecated
-    print(f"Score: {score:.4f}")
+def evaluate_task(model, task_name, dataset, prompt_func, metric_func=accuracy, concurrency=None, journal=None,
+                  generation_kwargs=None, options=None, pack_size=1, indices=None, quiet=False):
+    if concurrency is None:
+        concurrency = get_concurrency(model.model_name)
+    
+    samples = list(dataset)
+    # With --shard, only this machine's slice of the samples is evaluated; queue workers pass their leased indices
+    if indices is None:
+        indices = [i for i in range(len(samples)) if in_shard(model.model_name, task_name, i)]
+    selected = indices
+    # quiet: queue workers call this once per lease and report progress themselves
+    if not selected:
+        if not quiet:
+            print(f"Skipping {model.model_name} on {task_name}: no samples assigned here")
+        return [], 0.0
+    shard_note = f" ({len(selected)} assigned here)" if len(selected) < len(samples) else ""
+    if not quiet:
+        print(f"Evaluating {model.model_name} on {task_name} ({len(dataset)} samples{shard_note}, concurrency={concurrency})...")
+    
+    prompt_list = {i: prompt_func(samples[i]) for i in selected}
+    results = [None] * len(samples)
+    
+    # Samples already completed by an interrupted run come back from the journal as-is
+    if journal:
+        for i, result in journal.completed(model.model_name, task_name).items():
+            if i < len(results):
+                results[i] = {**result, "sample_index": result.get("sample_index", i)}
+    pending = [i for i in selected if results[i] is None]
+    if len(pending) < len(selected) and not quiet:
+        print(f"Resuming: {len(selected) - len(pending)} samples already completed")
+    
+    # Logprob mode: one single-token request per sample, answer read off the option probabilities
+    request = None
+    if options and config.EVAL_MODE == "logprob" and model.supports_logprobs:
+        request = lambda prompt: model.score_options(prompt, options)
+        generation_kwargs = None
+    
+    def on_result(j, output):
+        i = pending[j]
+        if request is None:
+            results[i] = build_result(model, task_name, samples[i], output, sample_index=i)
+        else:
+            option_probs = {"distribution": output["distribution"], "top_logprobs": output["top_logprobs"]}
+            results[i] = build_result(model, task_name, samples[i], output["prediction"], sample_index=i,
+                                      option_probs=json.dumps(option_probs, ensure_ascii=False))
+        if journal:
+            journal.record(model.model_name, task_name, i, results[i])
+    
+    def on_packed_result(j, prediction, packed):
+        i = pending[j]
+        results[i] = build_result(model, task_name, samples[i], prediction, sample_index=i,
+                                  pack_size=pack_size, packed=packed)
+        if journal:
+            journal.record(model.model_name, task_name, i, results[i])
+    
+    if request is None and pack_size > 1:
+        generate_packed(model, [prompt_list[i] for i in pending], pack_size, concurrency, on_result=on_packed_result,
+                        desc=f"{model.model_name} {task_name}", show_progress=not quiet, **(generation_kwargs or {}))
+    else:
+        generate_all(model, [prompt_list[i] for i in pending], concurrency, on_result=on_result,
+                     desc=f"{model.model_name} {task_name}", request=request, show_progress=not quiet,
+                     **(generation_kwargs or {}))
+    
+    results = [results[i] for i in selected]
+    predictions = [result["prediction"] for result in results]
+    references = [result["reference"] for result in results]
+    score = metric_func(predictions, references, task_name) if metric_func else 0.0
+    if metric_func and not quiet:
+        print(f"Score: {score:.4f}")
     
     return results, score
 
-from src.benchmarks.kmmlu import CATEGORIES as KMMLU_CATEGORIES
-from src.evaluation.prompts import format_logickor, format_haerae
+def _run_task(model, spec, dataset, timestamp, journal):
+    results, score = evaluate_task(model, spec.task_name, dataset, spec.prompt_func,
+                                   metric_func=spec.metric_func, journal=journal,
+                                   generation_kwargs=spec.generation_kwargs, options=spec.options,
+                                   pack_size=spec.pack_size)
+    if results:
+        save_task_results(model.model_name, spec, results, timestamp)
+
+def save_task_results(model_name, spec, results, timestamp):
+    if "parquet" in config.RESULTS_FORMATS:
+        output_path = write_task_results(timestamp, model_name, spec.benchmark, spec.task_name, results)
+        print(f"Saved results to {output_path}")
+    if "csv" in config.RESULTS_FORMATS:
+        df = pd.DataFrame(results)
+        output_path = f"{config.RESULTS_DIR}/{timestamp}_{model_name}_{spec.task_name}.csv"
+        df.to_csv(output_path, index=False)
+        print(f"Saved results to {output_path}")
 
-def run_evaluation():
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+def run_evaluation(run_id=None, new_run_id=None):
+    """
+    Evaluates every enabled model on every enabled benchmark.
+    
+    Args:
+        run_id: id of an interrupted run to resume. Samples already recorded in its
+                journal are skipped and its settings and output names are reused.
+        new_run_id: id for a fresh run instead of the current timestamp
+                    (shards of one run all use the same id)
+    """
+    if run_id:
+        load_run_config(run_id)
+        print(f"Resuming run {run_id}")
+    else:
+        run_id = new_run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        print(f"Run ID: {run_id}")
+    if config.SHARD:
+        print(f"Shard {config.SHARD[0]}/{config.SHARD[1]}, results in {config.RESULTS_DIR}")
+    timestamp = run_id
     os.makedirs(config.RESULTS_DIR, exist_ok=True)
     
     # Initialize models
@@ -89,74 +173,28 @@ def run_evaluation():
     if not models:
         print("No models initialized. Exiting.")
         return
+    if config.USE_PREFLIGHT:
+        apply_preflight(models)
 
-    # Run Benchmarks
-    if "kobest" in config.ENABLED_BENCHMARKS:
-        for task in ['boolq', 'copa', 'hellaswag', 'sentineg', 'wic']:
-            try:
-                ds = load_kobest(task, config.SAMPLE_SIZE)['test']
-                prompt_func = getattr(prompts, f"format_kobest_{task}")
-                
-                for model in models:
-                    results, score = evaluate_task(model, f"kobest_{task}", ds, prompt_func)
-                    
-                    df = pd.DataFrame(results)
-                    output_path = f"{config.RESULTS_DIR}/{timestamp}_{model.model_name}_kobest_{task}.csv"
-                    df.to_csv(output_path, index=False)
-                    print(f"Saved results to {output_path}")
-            except Exception as e:
-                print(f"Error evaluating kobest_{task}: {e}")
-
-    if "kmmlu" in config.ENABLED_BENCHMARKS:
-        # Evaluate all or subset based on config? For now, iterate all if not specified otherwise.
-        # But for brevity in this run, we might want to limit.
-        # Let's use the full list but catch errors.
-        for cat in KMMLU_CATEGORIES:
-            try:
-                ds = load_kmmlu(cat, config.SAMPLE_SIZE)['test']
-                for model in models:
-                    results, score = evaluate_task(model, f"kmmlu_{cat}", ds, prompts.format_kmmlu)
-                    
-                    df = pd.DataFrame(results)
-                    output_path = f"{config.RESULTS_DIR}/{timestamp}_{model.model_name}_kmmlu_{cat}.csv"
-                    df.to_csv(output_path, index=False)
-            except Exception as e:
-                print(f"Error evaluating kmmlu_{cat}: {e}")
-
-    if "logickor" in config.ENABLED_BENCHMARKS:
+    save_run_config(run_id)
+    plan = build_plan()
+    print(f"Work plan: {len(plan)} tasks x {len(models)} models")
+    if config.QUEUE_MODE:
+        run_queue(run_id, models, plan)
+    else:
+        journal = RunJournal(run_id)
         try:
-             ds = load_logickor(config.SAMPLE_SIZE)['train'] # LogicKor uses train usually as it's small
-             for model in models:
-                # LogicKor needs special metric or judge. For now just generating answers.
-                # Metric func can be dummy or None.
-                results, score = evaluate_task(model, "logickor", ds, format_logickor, metric_func=lambda p, r: 0.0)
-                
-                df = pd.DataFrame(results)
-                output_path = f"{config.RESULTS_DIR}/{timestamp}_{model.model_name}_logickor.csv"
-                df.to_csv(output_path, index=False)
-        except Exception as e:
-            print(f"Error evaluating logickor: {e}")
-
-    if "haerae" in config.ENABLED_BENCHMARKS:
-        tasks = [
-            'correct_definition_matching', 'csat_geo', 'csat_law', 'csat_socio', 
-            'date_understanding', 'general_knowledge', 'history', 'loan_words', 
-            'lyrics_denoising', 'proverbs_denoising', 'rare_words', 
-            'standard_nomenclature', 'reading_comprehension'
-        ]
-        for task in tasks:
-            try:
-                ds = load_haerae(task, config.SAMPLE_SIZE).get('test', load_haerae(task, config.SAMPLE_SIZE).get('train'))
-                # HAE-RAE structure check needed. Using generic prompt.
-                for model in models:
-                    results, score = evaluate_task(model, f"haerae_{task}", ds, format_haerae)
-                    
-                    df = pd.DataFrame(results)
-                    output_path = f"{config.RESULTS_DIR}/{timestamp}_{model.model_name}_haerae_{task}.csv"
-                    df.to_csv(output_path, index=False)
-            except Exception as e:
-                print(f"Error evaluating haerae_{task}: {e}")
+            run_plan(models, plan, lambda model, spec, dataset: _run_task(model, spec, dataset, timestamp, journal))
+        finally:
+            journal.close()
     
+    print_connection_stats()
+    print_cache_stats()
+    print_rate_limit_stats()
+    print_hedging_stats()
+    summary = export_telemetry(get_run_dir(run_id))
+    if summary:
+        print_telemetry_summary(summary)
     print("Evaluation complete.")
 
 if __name__ == "__main__":
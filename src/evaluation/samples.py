@@ -0,0 +1,69 @@
+
+import json
+import hashlib
+import functools
+from src.benchmarks.snapshot import load_source
+from src.benchmarks.utils import SOURCE_COLUMN
+from src.evaluation import prompts
+
+
+def content_hash(sample):
+    """Short hash of a dataset row, so a result can tell when its snapshot row changed."""
+    raw = json.dumps(sample, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def make_sample_id(sample):
+    """
+    Stable id of a dataset row: "<dataset>/<config>:<split>:<row>:<content hash>".
+    Rows loaded without a source column get "unknown:<content hash>".
+    """
+    sample = dict(sample)
+    source = sample.pop(SOURCE_COLUMN, None) or "unknown"
+    return f"{source}:{content_hash(sample)}"
+
+
+def parse_sample_id(sample_id):
+    """Splits a sample id into (dataset, config or None, split, row, content hash)."""
+    source, split, row, digest = sample_id.rsplit(":", 3)
+    parts = source.split("/")
+    # Hub ids are "<org>/<name>"; a config, if any, follows
+    return "/".join(parts[:2]), "/".join(parts[2:]) or None, split, int(row), digest
+
+
+@functools.lru_cache(maxsize=None)
+def _load_split(path, name, split):
+    return load_source(path, name)[split]
+
+
+def load_sample(sample_id):
+    """Reads the dataset row a sample id refers to from its snapshot (or the Hub)."""
+    if sample_id.startswith("unknown:"):
+        raise ValueError(f"Sample id {sample_id} has no dataset source")
+    path, name, split, row, digest = parse_sample_id(sample_id)
+    sample = dict(_load_split(path, name, split)[row])
+    sample.pop(SOURCE_COLUMN, None)
+    if content_hash(sample) != digest:
+        raise ValueError(f"Row {row} of {path} ({name or 'default'}, {split}) changed since {sample_id} was recorded")
+    return sample
+
+
+_warned_versions = set()
+
+
+def render_prompt(task_name, sample_id, template_version=None):
+    """Rebuilds the prompt a result was generated from."""
+    if template_version is not None and str(template_version) != str(prompts.TEMPLATE_VERSION) \
+            and template_version not in _warned_versions:
+        _warned_versions.add(template_version)
+        print(f"Warning: results use prompt template version {template_version}, "
+              f"rebuilding with version {prompts.TEMPLATE_VERSION}")
+    return prompts.get_prompt_func(task_name)(load_sample(sample_id))
+
+
+def row_prompt(row):
+    """The prompt of a stored result row: legacy rows carry it, newer ones are rebuilt from sample_id."""
+    prompt = row.get("prompt")
+    if isinstance(prompt, str) and prompt:
+        return prompt
+    return render_prompt(row["task"], row["sample_id"], row.get("template_version"))
@@ -0,0 +1,134 @@
+
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+import config
+from src.benchmarks import load_kobest, load_kmmlu, load_haerae, load_logickor
+from src.benchmarks.kobest import TASKS as KOBEST_TASKS
+from src.benchmarks.kmmlu import CATEGORIES as KMMLU_CATEGORIES
+from src.benchmarks.haerae import TASKS as HAERAE_TASKS
+from src.evaluation import prompts
+from src.evaluation.scoring import accuracy, find_confident_answer
+
+
+@dataclass
+class TaskSpec:
+    """One benchmark task of the work plan. Output files are named after task_name."""
+    benchmark: str
+    task_name: str
+    load: Callable
+    prompt_func: Callable
+    metric_func: Optional[Callable] = accuracy  # (predictions, references, task_name) -> score; None skips scoring
+    generation_kwargs: dict = field(default_factory=dict)
+    options: Optional[list] = None  # Answer tokens, enables logprob scoring (EVAL_MODE = "logprob")
+    pack_size: int = 1  # Questions per request, see config.PACK_SIZE
+
+
+# Answer tokens each KoBEST prompt asks for (see src/evaluation/prompts.py)
+KOBEST_OPTIONS = {
+    'boolq': ["0", "1"],
+    'copa': ["1", "2"],
+    'hellaswag': ["1", "2", "3", "4"],
+    'sentineg': ["0", "1"],
+    'wic': ["0", "1"],
+}
+
+
+def _mc_generation_kwargs():
+    # Multiple-choice tasks only need the answer token: stream and stop once it appears
+    if config.STREAM_MC:
+        return {"stream": True, "stop_when": find_confident_answer}
+    return {}
+
+
+def build_plan():
+    """Expands the enabled benchmarks into the ordered list of tasks to evaluate."""
+    plan = []
+
+    if "kobest" in config.ENABLED_BENCHMARKS:
+        for task in KOBEST_TASKS:
+            plan.append(TaskSpec(
+                "kobest", f"kobest_{task}",
+                load=lambda task=task: load_kobest(task, config.SAMPLE_SIZE, split='test'),
+                prompt_func=getattr(prompts, f"format_kobest_{task}"),
+                generation_kwargs=_mc_generation_kwargs(),
+                options=KOBEST_OPTIONS[task]
+            ))
+
+    if "kmmlu" in config.ENABLED_BENCHMARKS:
+        for cat in KMMLU_CATEGORIES:
+            plan.append(TaskSpec(
+                "kmmlu", f"kmmlu_{cat}",
+                load=lambda cat=cat: load_kmmlu(cat, config.SAMPLE_SIZE, split='test'),
+                prompt_func=prompts.format_kmmlu,
+                generation_kwargs=_mc_generation_kwargs(),
+                options=["A", "B", "C", "D"],
+                pack_size=config.PACK_SIZE.get("kmmlu", 1)
+            ))
+
+    if "logickor" in config.ENABLED_BENCHMARKS:
+        # LogicKor uses train usually as it's small, and needs a judge (score_logickor.py) rather than accuracy
+        plan.append(TaskSpec(
+            "logickor", "logickor",
+            load=lambda: load_logickor(config.SAMPLE_SIZE, split='train'),
+            prompt_func=prompts.format_logickor,
+            metric_func=None
+        ))
+
+    if "haerae" in config.ENABLED_BENCHMARKS:
+        for task in HAERAE_TASKS:
+            plan.append(TaskSpec(
+                "haerae", f"haerae_{task}",
+                load=lambda task=task: load_haerae(task, config.SAMPLE_SIZE, split=['test', 'train']),
+                prompt_func=prompts.format_haerae,
+                generation_kwargs=_mc_generation_kwargs(),
+                pack_size=config.PACK_SIZE.get("haerae", 1)
+            ))
+
+    return plan
+
+
+class DatasetCache:
+    """Loads each task's dataset once and shares it between the model workers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks = {}
+        self._datasets = {}
+
+    def get(self, spec):
+        with self._lock:
+            task_lock = self._locks.setdefault(spec.task_name, threading.Lock())
+        with task_lock:
+            if spec.task_name not in self._datasets:
+                self._datasets[spec.task_name] = spec.load()
+            return self._datasets[spec.task_name]
+
+
+def run_plan(models, plan, run_task):
+    """
+    Runs the (task, model) grid with one worker per model, so models served by
+    different deployments make progress at the same time. Each worker walks the
+    plan in order; in-task concurrency is still bounded per model by run_task.
+
+    Args:
+        models: initialized BaseModel instances
+        plan: list of TaskSpec from build_plan
+        run_task: callable(model, spec, dataset) that evaluates and saves one task
+    """
+    datasets = DatasetCache()
+
+    def _worker(model):
+        for spec in plan:
+            try:
+                run_task(model, spec, datasets.get(spec))
+            except Exception as e:
+                print(f"Error evaluating {spec.task_name} for {model.model_name}: {e}")
+
+    workers = [threading.Thread(target=_worker, args=(model,), daemon=True) for model in models]
+    for worker in workers:
+        worker.start()
+    # Join with a timeout so KeyboardInterrupt still reaches the main thread
+    for worker in workers:
+        while worker.is_alive():
+            worker.join(0.5)
@@ -0,0 +1,103 @@
+
+import re
+import numpy as np
+import pandas as pd
+
+# Extraction rules, tried in order; the first one that matches wins.
+# Observed model outputs: "정답: **2**", "정답은 2번", "A", "2", "Yes"/"참"
+ANSWER_PATTERN = re.compile(r'(?:정답|Answer|답)[:\s]*(?:\*\*|\[)?([1-5A-E])(?:\*\*|\])?', re.IGNORECASE)
+NUMBER_PATTERN = re.compile(r'([1-5])\s*번')
+LEADING_PATTERN = re.compile(r'^([1-5A-E])(?:\.|\)|:|$)', re.IGNORECASE)
+YES_PREFIXES = ("yes", "true")
+YES_MARKERS = ("정답: 예", "정답: 참")
+NO_PREFIXES = ("no", "false")
+NO_MARKERS = ("정답: 아니오", "정답: 거짓")
+
+# Option letters and boolean words map onto the numeric labels used by the datasets
+ANSWER_MAPPING = {'A': '1', 'B': '2', 'C': '3', 'D': '4', 'E': '5', 'TRUE': '1', 'FALSE': '0', 'YES': '1', 'NO': '0'}
+
+# KoBEST COPA & HellaSwag labels are 0-indexed while the prompts ask for 1-based options
+ONE_BASED_TASKS = ["kobest_copa", "kobest_hellaswag"]
+
+def extract_answers(predictions: pd.Series) -> pd.Series:
+    """
+    Extracts the answer token from every raw prediction at once.
+    Predictions without a recognisable answer are returned stripped, unchanged.
+    """
+    text = pd.Series(predictions).fillna("").astype(str).str.strip()
+    lower = text.str.lower()
+
+    answer = text.str.extract(ANSWER_PATTERN, expand=False).str.upper()
+    answer = answer.fillna(text.str.extract(NUMBER_PATTERN, expand=False))
+    answer = answer.fillna(text.str.extract(LEADING_PATTERN, expand=False).str.upper())
+
+    is_yes = lower.str.startswith(YES_PREFIXES)
+    for marker in YES_MARKERS:
+        is_yes |= text.str.contains(marker, regex=False)
+    is_no = lower.str.startswith(NO_PREFIXES)
+    for marker in NO_MARKERS:
+        is_no |= text.str.contains(marker, regex=False)
+    boolean = pd.Series(np.where(is_yes, "1", np.where(is_no, "0", None)), index=text.index)
+
+    return answer.fillna(boolean).fillna(text).astype(object)
+
+
+def extract_answer(text: str) -> str:
+    """Single-prediction form of extract_answers."""
+    return extract_answers(pd.Series([text])).iloc[0]
+
+
+def find_confident_answer(text: str):
+    """
+    Returns the answer if text already states it explicitly (e.g. "정답: **2**"), else None.
+    Used to cut off streamed responses; looser rules (bare "2", "2번") could still be the
+    start of reasoning, so only the explicit answer pattern counts.
+    """
+    match = ANSWER_PATTERN.search(text)
+    return match.group(1).upper() if match else None
+
+
+def _normalize(values: pd.Series) -> pd.Series:
+    values = pd.Series(values).fillna("").astype(str)
+    return values.str.upper().map(ANSWER_MAPPING).fillna(values)
+
+
+def _parse_int(value):
+    # Python's int() rule: surrounding whitespace, a sign, "_" separators and any Unicode digits ("١")
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _to_int(values: pd.Series) -> pd.Series:
+    return values.map(_parse_int).astype(object)
+
+
+def score_predictions(predictions, references, task_name) -> pd.Series:
+    """
+    Returns a boolean Series marking which predictions match their reference.
+
+    Args:
+        predictions: raw model outputs
+        references: dataset labels
+        task_name: e.g. "kobest_copa", decides index-offset handling
+    """
+    predictions = pd.Series(predictions).reset_index(drop=True)
+    references = pd.Series(references).reset_index(drop=True)
+
+    pred = _normalize(extract_answers(predictions))
+    ref = _normalize(references)
+    correct = pred == ref
+
+    if task_name in ONE_BASED_TASKS:
+        # Pred 1 for Ref 0 is a match
+        offset = [p is not None and r is not None and p - 1 == r for p, r in zip(_to_int(pred), _to_int(ref))]
+        correct |= pd.Series(offset, index=correct.index, dtype=bool)
+
+    return correct
+
+
+def accuracy(predictions, references, task_name) -> float:
+    correct = score_predictions(predictions, references, task_name)
+    return float(correct.mean()) if len(correct) else 0.0
@@ -0,0 +1,188 @@
+
+import os
+import re
+import glob
+import hashlib
+import pandas as pd
+import config
+from src.evaluation.scheduler import build_plan
+from src.evaluation.journal import get_run_dir, save_run_config, load_run_config, read_run_config
+from src.evaluation.store import find_run_outputs, read_task_file, write_task_results
+
+_SHARD_DIR = re.compile(r"^(\d+)of(\d+)$")
+
+
+def parse_shard(value):
+    """Parses "i/N" (1 <= i <= N) into (i, N)."""
+    match = re.fullmatch(r"(\d+)/(\d+)", value.strip())
+    if not match:
+        raise ValueError(f"Expected --shard i/N, got {value!r}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}, got {index}")
+    return index, count
+
+
+def in_shard(model_name, task_name, sample_index, shard=None):
+    """
+    Assigns every (model, task, sample) of the work plan to exactly one of N shards.
+    The split is a hash of the ids, so every machine computes the same slices
+    without coordination (given the same config and dataset snapshots).
+    """
+    shard = shard or config.SHARD
+    if not shard:
+        return True
+    index, count = shard
+    key = f"{model_name}\x1f{task_name}\x1f{sample_index}".encode("utf-8")
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big") % count == index - 1
+
+
+def get_shard_dir(run_id, shard, results_dir=None):
+    """Results directory of one shard; kept apart so the leaderboard only sees merged runs."""
+    index, count = shard
+    return os.path.join(results_dir or config.RESULTS_DIR, "shards", run_id, f"{index}of{count}")
+
+
+def _find_shards(run_id, results_dir):
+    shards = {}
+    for path in glob.glob(os.path.join(results_dir, "shards", run_id, "*of*")):
+        match = _SHARD_DIR.match(os.path.basename(path))
+        if match:
+            shards[(int(match.group(1)), int(match.group(2)))] = path
+    return shards
+
+
+def _read_run_config(shard_dir, run_id):
+    saved = read_run_config(run_id, shard_dir)
+    if saved:
+        saved.pop("SHARD", None)
+    return saved
+
+
+def _concat(model_name, task_name, frames):
+    df = pd.concat(frames, ignore_index=True)
+    order = pd.to_numeric(df["sample_index"]).sort_values(kind="stable").index
+    df = df.loc[order].reset_index(drop=True)
+    duplicates = df["sample_index"].astype(str).duplicated()
+    if duplicates.any():
+        print(f"Warning: {model_name} {task_name}: {duplicates.sum()} samples in more than one shard, keeping the first")
+        df = df[~duplicates].reset_index(drop=True)
+    return df
+
+
+def _missing_samples(frames, count):
+    """
+    Compares the merged sample indices of every (model, task) with the run's work plan: all
+    shards together must cover every sample of every planned task of each model that ran.
+    A shard whose task failed (run_plan logs the error and moves on) leaves a gap here.
+
+    Returns:
+        [(model, task, format, missing indices, shards they belong to)]
+    """
+    sizes = {spec.task_name: len(spec.load()) for spec in build_plan()}
+    model_names = sorted({model_name for model_name, _ in frames})
+    missing = []
+    for model_name in model_names:
+        for task_name, size in sizes.items():
+            formats = frames.get((model_name, task_name)) or {fmt: None for fmt in config.RESULTS_FORMATS}
+            for fmt, df in formats.items():
+                present = set() if df is None else set(pd.to_numeric(df["sample_index"]).astype(int))
+                indices = [i for i in range(size) if i not in present]
+                if indices:
+                    owners = sorted({index for i in indices for index in range(1, count + 1)
+                                     if in_shard(model_name, task_name, i, (index, count))})
+                    missing.append((model_name, task_name, fmt, indices, owners))
+    return missing
+
+
+def merge_shards(run_id):
+    """
+    Combines the outputs of `--shard i/N --run-id RUN_ID` runs (copied under
+    RESULTS_DIR/shards/RUN_ID/) into one run RUN_ID with the same per-task files a
+    single-node run writes. Refuses to merge while shards, any configured output format
+    of a task in some shard, or any sample of the run's work plan are missing.
+
+    Returns:
+        {(model, task): rows merged}, or None when the shards are incomplete
+    """
+    results_dir = config.RESULTS_DIR
+    shards = _find_shards(run_id, results_dir)
+    if not shards:
+        print(f"No shards found for run {run_id} under {os.path.join(results_dir, 'shards', run_id)}")
+        return None
+    counts = {count for _, count in shards}
+    if len(counts) > 1:
+        print(f"Shards of run {run_id} disagree on the shard count: {sorted(counts)}")
+        return None
+    count = counts.pop()
+    missing = [index for index in range(1, count + 1) if (index, count) not in shards]
+    if missing:
+        print(f"Run {run_id}: missing shards {', '.join(f'{index}/{count}' for index in missing)}")
+        return None
+
+    configured = [(shard, _read_run_config(path, run_id)) for shard, path in sorted(shards.items())]
+    configured = [(shard, saved) for shard, saved in configured if saved]
+    for (index, _), saved in configured[1:]:
+        if saved != configured[0][1]:
+            print(f"Warning: shard {index}/{count} ran with different settings: {saved}")
+
+    # Restore the shards' plan settings, then record the merged run as an unsharded one
+    if configured:
+        load_run_config(run_id, shards[configured[0][0]])
+    config.SHARD = None
+
+    outputs = {}
+    for shard, path in sorted(shards.items()):
+        for key, output in find_run_outputs(run_id, path).items():
+            outputs.setdefault(key, []).append(output)
+
+    if not outputs:
+        print(f"Error: no result files found in the shards of run {run_id}")
+        return None
+    incomplete = [(model_name, task_name, fmt) for (model_name, task_name), parts in sorted(outputs.items())
+                  for fmt in config.RESULTS_FORMATS if not all(part.get(fmt) for part in parts)]
+    if incomplete:
+        for model_name, task_name, fmt in incomplete:
+            print(f"Error: some shards of run {run_id} lack the {fmt} output of {model_name} {task_name}")
+        return None
+
+    # Each format is merged from the same format, so the files match a single-node run's
+    frames = {}
+    for (model_name, task_name), parts in sorted(outputs.items()):
+        if "parquet" in config.RESULTS_FORMATS:
+            frames.setdefault((model_name, task_name), {})["parquet"] = \
+                _concat(model_name, task_name, [read_task_file(part["parquet"]) for part in parts])
+        if "csv" in config.RESULTS_FORMATS:
+            frames.setdefault((model_name, task_name), {})["csv"] = \
+                _concat(model_name, task_name, [pd.read_csv(part["csv"], dtype=str, keep_default_na=False) for part in parts])
+
+    missing = _missing_samples(frames, count)
+    if missing:
+        for model_name, task_name, fmt, indices, owners in missing:
+            print(f"Error: run {run_id} lacks {len(indices)} samples of {model_name} {task_name} in the {fmt} outputs "
+                  f"(shards {', '.join(f'{index}/{count}' for index in owners)}), e.g. {indices[:5]}")
+        return None
+
+    os.makedirs(get_run_dir(run_id, results_dir), exist_ok=True)
+    merged = {}
+    for (model_name, task_name), formats in frames.items():
+        benchmark = outputs[(model_name, task_name)][0]["benchmark"]
+        for fmt, df in formats.items():
+            if fmt == "parquet":
+                write_task_results(run_id, model_name, benchmark, task_name, df.to_dict("records"))
+            else:
+                df.to_csv(f"{results_dir}/{run_id}_{model_name}_{task_name}.csv", index=False)
+            merged[(model_name, task_name)] = len(df)
+
+    # The merged journal lets --repair and --resume work on the merged run
+    with open(os.path.join(get_run_dir(run_id, results_dir), "journal.jsonl"), "w", encoding="utf-8") as out:
+        for shard, path in sorted(shards.items()):
+            journal_path = os.path.join(get_run_dir(run_id, path), "journal.jsonl")
+            if os.path.exists(journal_path):
+                with open(journal_path, encoding="utf-8") as f:
+                    # A torn last line (a shard that crashed) must not swallow the next shard's first record
+                    out.writelines(line for line in f if line.endswith("\n"))
+    save_run_config(run_id, results_dir)
+
+    print(f"Merged {count} shards of run {run_id}: {len(merged)} task outputs, {sum(merged.values())} samples")
+    return merged
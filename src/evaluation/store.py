@@ -0,0 +1,200 @@
+
+import os
+import glob
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import config
+
+# Row schema of every stored task file. run/model/benchmark are hive partition
+# keys taken from the directory layout, so they are not repeated inside files.
+SCHEMA = pa.schema([
+    ("task", pa.string()),
+    ("sample_index", pa.int64()),
+    ("sample_id", pa.string()),     # Dataset row the prompt is rebuilt from (src/evaluation/samples.py)
+    ("template_version", pa.int64()),  # prompts.TEMPLATE_VERSION at generation time
+    ("prediction", pa.string()),
+    ("reference", pa.string()),
+    ("option_probs", pa.string()),  # JSON, logprob mode only
+    ("pack_size", pa.int64()),      # Questions per request, packed tasks only
+    ("packed", pa.bool_()),         # False when the packed answer was unparsed and re-asked alone
+    ("prompt", pa.string()),        # Imported legacy CSV rows only: they have no sample_id to rebuild it from
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("run", pa.string()), ("model", pa.string()), ("benchmark", pa.string())]),
+    flavor="hive"
+)
+
+
+def _full_schema():
+    return pa.schema(list(PARTITIONING.schema) + list(SCHEMA))
+
+
+def get_store_dir(results_dir=None):
+    return os.path.join(results_dir or config.RESULTS_DIR, "store")
+
+
+def task_path(run_id, model_name, benchmark, task_name, results_dir=None):
+    return os.path.join(
+        get_store_dir(results_dir),
+        f"run={run_id}", f"model={model_name}", f"benchmark={benchmark}",
+        f"{task_name}.parquet"
+    )
+
+
+def _to_table(results):
+    df = pd.DataFrame(results)
+    if "sample_index" not in df.columns:
+        df["sample_index"] = range(len(df))
+    columns = {}
+    for field in SCHEMA:
+        values = df[field.name] if field.name in df.columns else pd.Series([None] * len(df))
+        if field.type == pa.string():
+            # Nulls (None or NaN from a DataFrame round trip) stay null, everything else becomes text
+            present = values.notna()
+            values = values.astype(object).where(present, None)
+            values[present] = values[present].astype(str)
+        elif field.type == pa.bool_():
+            # CSV imports carry "True"/"False"/"" strings
+            values = values.map({True: True, False: False, "True": True, "False": False}).astype(object)
+            values = values.where(values.notna(), None)
+        else:
+            values = pd.to_numeric(values, errors="coerce").astype("Int64").astype(object)
+            values = values.where(values.notna(), None)
+        columns[field.name] = pa.array(values.tolist(), type=field.type)
+    return pa.table(columns, schema=SCHEMA)
+
+
+def write_task_results(run_id, model_name, benchmark, task_name, results, results_dir=None):
+    """
+    Writes one (run, model, task) result set as a zstd-compressed Parquet file.
+    Called as each task finishes, so the store grows as the run progresses.
+    """
+    path = task_path(run_id, model_name, benchmark, task_name, results_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    pq.write_table(_to_table(results), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+    return path
+
+
+def parse_task_path(path):
+    """Returns (run_id, model, benchmark, task) for a file written by write_task_results."""
+    parts = os.path.normpath(path).split(os.sep)
+    run_id, model_name, benchmark = (part.split("=", 1)[1] for part in parts[-4:-1])
+    return run_id, model_name, benchmark, parts[-1][:-len(".parquet")]
+
+
+def list_task_files(results_dir=None):
+    return sorted(glob.glob(os.path.join(get_store_dir(results_dir), "run=*", "model=*", "benchmark=*", "*.parquet")))
+
+
+def read_results(columns=None, filter=None, results_dir=None):
+    """
+    Reads stored results as a DataFrame, loading only the requested columns.
+
+    Args:
+        columns: column names to project (partition keys run/model/benchmark included);
+                 None reads everything
+        filter: optional pyarrow.dataset expression, e.g. ds.field("run") == "20260118_175403"
+    """
+    files = list_task_files(results_dir)
+    if not files:
+        return pd.DataFrame(columns=columns or ["run", "model", "benchmark"] + SCHEMA.names)
+    dataset = ds.dataset(files, format="parquet", partitioning=PARTITIONING,
+                         partition_base_dir=get_store_dir(results_dir), schema=_full_schema())
+    return dataset.to_table(columns=columns, filter=filter).to_pandas()
+
+
+def read_task_file(path, columns=None):
+    return pq.read_table(path, columns=columns).to_pandas()
+
+
+def _split_model_task(rest, filename):
+    for benchmark in ["kobest", "kmmlu", "haerae", "logickor"]:
+        marker = f"_{benchmark}"
+        pos = rest.find(marker)
+        if pos > 0:
+            return rest[:pos], rest[pos + 1:]
+    raise ValueError(f"Unrecognised result file name: {filename}")
+
+
+def parse_result_filename(filename, run_id=None):
+    """
+    Splits a per-task CSV name `{run_id}_{model}_{task}.csv` into (run_id, model, task).
+    Model names may contain '-' and '.', task names start with the benchmark prefix.
+    Without run_id the name must start with a timestamp run id (`{YYYYMMDD}_{HHMMSS}`);
+    runs started with a custom --run-id are only recognised when it is given.
+    """
+    stem = os.path.basename(filename)[:-len(".csv")]
+    if run_id is not None:
+        if not stem.startswith(f"{run_id}_"):
+            raise ValueError(f"{filename} does not belong to run {run_id}")
+        return (run_id, *_split_model_task(stem[len(run_id) + 1:], filename))
+    parts = stem.split("_", 2)
+    if len(parts) < 3 or not (parts[0].isdigit() and parts[1].isdigit()):
+        raise ValueError(f"Unrecognised result file name: {filename}")
+    date, time_, rest = parts
+    return (f"{date}_{time_}", *_split_model_task(rest, filename))
+
+
+def find_run_outputs(run_id, results_dir=None):
+    """Returns {(model, task): {"benchmark", "parquet", "csv"}} for every output file of a run."""
+    results_dir = results_dir or config.RESULTS_DIR
+    outputs = {}
+    for path in list_task_files(results_dir):
+        run, model_name, benchmark, task_name = parse_task_path(path)
+        if run == run_id:
+            outputs.setdefault((model_name, task_name), {"benchmark": benchmark})["parquet"] = path
+    for path in glob.glob(os.path.join(results_dir, f"{glob.escape(run_id)}_*.csv")):
+        if path.endswith("_scored.csv"):
+            continue
+        try:
+            _, model_name, task_name = parse_result_filename(path, run_id)
+        except ValueError:
+            continue
+        # "{run_id}_*" also matches runs whose id extends this one (run "r1" vs "r1_b"):
+        # the model and task columns settle where the run id ends
+        head = pd.read_csv(path, nrows=1, dtype=str, usecols=lambda column: column in ["model", "task"])
+        if len(head) and {"model", "task"} <= set(head.columns):
+            model_name, task_name = head["model"].iloc[0], head["task"].iloc[0]
+            if os.path.basename(path) != f"{run_id}_{model_name}_{task_name}.csv":
+                continue
+        outputs.setdefault((model_name, task_name), {"benchmark": task_name.split("_")[0]})["csv"] = path
+    return outputs
+
+
+def read_run_output(output):
+    """Reads one entry of find_run_outputs, preferring the Parquet file."""
+    if output.get("parquet"):
+        return read_task_file(output["parquet"])
+    return pd.read_csv(output["csv"], dtype=str, keep_default_na=False)
+
+
+def import_csv_results(results_dir=None, overwrite=False):
+    """
+    One-off import of per-task CSVs written by earlier runs into the Parquet store.
+    Their rows have no sample_id, so the prompt column is kept for repair and judging.
+
+    Returns:
+        Number of files imported
+    """
+    results_dir = results_dir or config.RESULTS_DIR
+    imported = 0
+    for filename in sorted(glob.glob(os.path.join(results_dir, "*.csv"))):
+        if "leaderboard" in filename or "aggregated" in filename or "packing_report" in filename or filename.endswith("_scored.csv"):
+            continue
+        try:
+            run_id, model_name, task_name = parse_result_filename(filename)
+            benchmark = task_name.split("_")[0]
+            if os.path.exists(task_path(run_id, model_name, benchmark, task_name, results_dir)) and not overwrite:
+                continue
+            df = pd.read_csv(filename, dtype=str, keep_default_na=False)
+            write_task_results(run_id, model_name, benchmark, task_name, df.to_dict("records"), results_dir)
+            imported += 1
+        except Exception as e:
+            print(f"Error importing {filename}: {e}")
+    print(f"Imported {imported} result files into {get_store_dir(results_dir)}")
+    return imported
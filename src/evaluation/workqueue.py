@@ -0,0 +1,410 @@
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+from tqdm import tqdm
+import config
+from src.evaluation.journal import get_run_dir
+
+
+def get_queue_path(run_id, results_dir=None):
+    return os.path.join(get_run_dir(run_id, results_dir), "queue.sqlite")
+
+
+class WorkQueue:
+    """
+    SQLite work queue of (model, task, sample) items with leases.
+
+    A worker leases a batch of pending items for QUEUE_VISIBILITY_TIMEOUT seconds and
+    keeps extending the lease with heartbeats while it works. Items whose lease expired
+    (the worker died or stalled) become leasable again. A result is only accepted from
+    the current lease holder, so each item ends up with exactly one result.
+    Items of a model that no live worker (one that heartbeat within the visibility
+    timeout) can serve count as "unserved" and do not keep the queue from draining.
+
+    Uses the rollback journal rather than WAL so the file also works for workers on
+    other hosts sharing the filesystem (which must support POSIX locks).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Autocommit; transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=60, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "id INTEGER PRIMARY KEY, model TEXT, task TEXT, sample_index INTEGER, "
+            "state TEXT DEFAULT 'pending', owner TEXT, lease_expires REAL, attempts INTEGER DEFAULT 0, "
+            "result TEXT, UNIQUE (model, task, sample_index))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_items_state ON items(state, model)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS workers ("
+            "worker_id TEXT PRIMARY KEY, host TEXT, pid INTEGER, started_at REAL, last_heartbeat REAL, completed INTEGER DEFAULT 0, "
+            "models TEXT)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def publish(self, items):
+        """Adds (model, task, sample_index) items; items already in the queue are kept as they are."""
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO items (model, task, sample_index) VALUES (?, ?, ?)", items)
+            return conn.total_changes - before
+
+    def register(self, worker_id, model_names):
+        """Records a worker and the models it initialized, i.e. the items it can serve."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO workers (worker_id, host, pid, started_at, last_heartbeat, models) VALUES (?, ?, ?, ?, ?, ?)",
+                (worker_id, socket.gethostname(), os.getpid(), now, now, json.dumps(sorted(model_names)))
+            )
+
+    def served_models(self):
+        """Models that some live worker can evaluate."""
+        with self._lock:
+            rows = self._conn.execute("SELECT models FROM workers WHERE last_heartbeat >= ?",
+                                      (time.time() - config.QUEUE_VISIBILITY_TIMEOUT,)).fetchall()
+        return {model_name for (models,) in rows for model_name in json.loads(models or "[]")}
+
+    def lease(self, worker_id, model_name, limit):
+        """Leases up to `limit` pending or expired items of a model. Returns [(id, task, sample_index)]."""
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, task, sample_index FROM items WHERE model = ? AND attempts < ? "
+                "AND (state = 'pending' OR (state = 'leased' AND lease_expires < ?)) ORDER BY id LIMIT ?",
+                (model_name, config.QUEUE_MAX_ATTEMPTS, now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE items SET state = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                [(worker_id, now + config.QUEUE_VISIBILITY_TIMEOUT, row[0]) for row in rows]
+            )
+        return rows
+
+    def heartbeat(self, worker_id):
+        """Extends every lease the worker holds, including the finalize claim."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("UPDATE items SET lease_expires = ? WHERE owner = ? AND state = 'leased'",
+                         (now + config.QUEUE_VISIBILITY_TIMEOUT, worker_id))
+            conn.execute("UPDATE workers SET last_heartbeat = ? WHERE worker_id = ?", (now, worker_id))
+            if self._meta(conn, "finalize_owner") == worker_id:
+                self._set_meta(conn, "finalize_expires", now + config.QUEUE_VISIBILITY_TIMEOUT)
+
+    def complete(self, worker_id, item_id, result):
+        """Stores an item's result if the worker still holds its lease. Returns False when the lease was lost."""
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE items SET state = 'done', result = ?, lease_expires = NULL "
+                "WHERE id = ? AND state = 'leased' AND owner = ?",
+                (json.dumps(result, ensure_ascii=False), item_id, worker_id)
+            ).rowcount
+            if updated:
+                conn.execute("UPDATE workers SET completed = completed + 1 WHERE worker_id = ?", (worker_id,))
+        return bool(updated)
+
+    def release(self, worker_id, item_ids=None):
+        """Returns the worker's unfinished leases (or just item_ids) to the queue without waiting for expiry."""
+        query = "UPDATE items SET state = 'pending', owner = NULL, lease_expires = NULL WHERE owner = ? AND state = 'leased'"
+        with self._transaction() as conn:
+            if item_ids is None:
+                conn.execute(query, (worker_id,))
+            else:
+                conn.executemany(query + " AND id = ?", [(worker_id, item_id) for item_id in item_ids])
+
+    def counts(self, model_name=None):
+        """Returns {"pending", "leased", "expired", "done", "abandoned", "unserved"} item counts (of one model or all)."""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model, CASE WHEN state != 'done' AND attempts >= ? AND (state = 'pending' OR lease_expires < ?) THEN 'abandoned' "
+                "WHEN state = 'leased' AND lease_expires < ? THEN 'expired' ELSE state END, COUNT(*) "
+                "FROM items WHERE ? IS NULL OR model = ? GROUP BY 1, 2",
+                (config.QUEUE_MAX_ATTEMPTS, now, now, model_name, model_name)
+            ).fetchall()
+        served = self.served_models()
+        counts = {"pending": 0, "leased": 0, "expired": 0, "done": 0, "abandoned": 0, "unserved": 0}
+        for model, state, count in rows:
+            # A live lease still counts as leased: its holder is working on it
+            if model not in served and state in ("pending", "expired"):
+                state = "unserved"
+            counts[state] += count
+        return counts
+
+    def drained(self, model_name=None):
+        """True once no item (of one model, or of any) can still be worked on by a live worker."""
+        counts = self.counts(model_name)
+        return counts["pending"] == counts["leased"] == counts["expired"] == 0
+
+    @staticmethod
+    def _meta(conn, key):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def claim_finalize(self, worker_id):
+        """
+        Lets one worker at a time write the run's output files. The claim is a lease: if its
+        holder dies before mark_finalized, another worker may claim it once it expires.
+        A finalized run can be claimed again when items were completed since (a late worker).
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            owner = self._meta(conn, "finalize_owner")
+            if owner and owner != worker_id and float(self._meta(conn, "finalize_expires")) >= now:
+                return False
+            done = conn.execute("SELECT COUNT(*) FROM items WHERE state = 'done'").fetchone()[0]
+            finalized_done = self._meta(conn, "finalized_done")
+            if finalized_done is not None and int(finalized_done) >= done:
+                return False
+            self._set_meta(conn, "finalize_owner", worker_id)
+            self._set_meta(conn, "finalize_expires", now + config.QUEUE_VISIBILITY_TIMEOUT)
+            self._set_meta(conn, "finalize_done", done)
+            return True
+
+    def mark_finalized(self, worker_id):
+        with self._transaction() as conn:
+            if self._meta(conn, "finalize_owner") != worker_id:
+                return
+            self._set_meta(conn, "finalized_done", self._meta(conn, "finalize_done"))
+            self._set_meta(conn, "finalized_at", time.time())
+            conn.execute("DELETE FROM meta WHERE key IN ('finalize_owner', 'finalize_expires')")
+
+    def finalized(self):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM meta WHERE key = 'finalized_at'").fetchone() is not None
+
+    def results(self, model_name, task_name):
+        """Returns the completed result rows of a (model, task) ordered by sample index."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM items WHERE model = ? AND task = ? AND state = 'done' ORDER BY sample_index",
+                (model_name, task_name)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def workers(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT worker_id, host, pid, last_heartbeat, completed FROM workers ORDER BY started_at"
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _LeaseRecorder:
+    """Journal stand-in for evaluate_task that completes queue items instead of logging them."""
+
+    def __init__(self, queue, worker_id, item_ids):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.item_ids = item_ids
+        self.done = 0
+        self.lost = 0
+
+    def completed(self, model_name, task_name):
+        return {}
+
+    def record(self, model_name, task_name, index, result):
+        if self.queue.complete(self.worker_id, self.item_ids[index], result):
+            self.done += 1
+        else:
+            # Our lease expired and the item went to another worker; its result wins
+            self.lost += 1
+
+
+def publish_plan(queue, models, plan, datasets):
+    """Publishes one item per (model, task, sample) of the plan."""
+    items = []
+    for spec in plan:
+        size = len(datasets.get(spec))
+        for model in models:
+            items.extend((model.model_name, spec.task_name, i) for i in range(size))
+    added = queue.publish(items)
+    print(f"Queue: published {added} new items ({len(items)} in the plan)")
+
+
+def run_worker(queue, models, plan, datasets, worker_id=None):
+    """
+    Leases and evaluates items until the queue is drained, one thread per model like
+    run_plan. Items another worker still holds are waited on, and taken over when
+    their lease expires.
+
+    Returns:
+        Number of items this worker completed
+    """
+    # Imported here: the runner imports this module for queue mode
+    from src.evaluation.runner import evaluate_task, get_concurrency
+
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    queue.register(worker_id, [model.model_name for model in models])
+    specs = {spec.task_name: spec for spec in plan}
+    completed = [0]
+    completed_lock = threading.Lock()
+    stop = threading.Event()
+
+    def _heartbeat():
+        while not stop.wait(config.QUEUE_HEARTBEAT_INTERVAL):
+            try:
+                queue.heartbeat(worker_id)
+            except sqlite3.OperationalError as e:
+                print(f"Queue heartbeat failed: {e}")
+
+    def _worker(model):
+        # Every lease is one evaluate_task call per task, so leases are large enough to keep
+        # the model's requests in flight and to fill whole packs
+        batch_size = max(2 * get_concurrency(model.model_name), config.QUEUE_LEASE_SIZE,
+                         *(spec.pack_size for spec in plan))
+        counts = queue.counts(model.model_name)
+        progress = tqdm(total=sum(counts.values()), initial=counts["done"], desc=f"{model.model_name} (queue)")
+        while True:
+            items = queue.lease(worker_id, model.model_name, batch_size)
+            if not items:
+                if queue.drained():
+                    progress.close()
+                    return
+                # Other workers hold the rest; wait in case their leases expire
+                time.sleep(config.QUEUE_POLL_INTERVAL)
+                continue
+            by_task = {}
+            for item_id, task_name, index in items:
+                by_task.setdefault(task_name, {})[index] = item_id
+            for task_name, item_ids in by_task.items():
+                spec = specs.get(task_name)
+                if spec is None:
+                    print(f"Queue: unknown task {task_name}, leaving its items to expire")
+                    continue
+                recorder = _LeaseRecorder(queue, worker_id, item_ids)
+                try:
+                    evaluate_task(model, task_name, datasets.get(spec), spec.prompt_func, metric_func=None,
+                                  journal=recorder, generation_kwargs=spec.generation_kwargs,
+                                  options=spec.options, pack_size=spec.pack_size, indices=sorted(item_ids), quiet=True)
+                except Exception as e:
+                    print(f"Error evaluating {task_name} for {model.model_name}: {e}")
+                    # Unfinished items go back to the queue; each failure counts towards QUEUE_MAX_ATTEMPTS
+                    queue.release(worker_id, item_ids.values())
+                with completed_lock:
+                    completed[0] += recorder.done
+                progress.update(recorder.done)
+
+    heartbeat = threading.Thread(target=_heartbeat, daemon=True)
+    heartbeat.start()
+    workers = [threading.Thread(target=_worker, args=(model,), daemon=True) for model in models]
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            while worker.is_alive():
+                worker.join(0.5)
+    finally:
+        stop.set()
+        queue.release(worker_id)
+    print(f"Queue worker {worker_id}: completed {completed[0]} items")
+    return completed[0]
+
+
+def finalize_queue(queue, run_id, plan, models, worker_id="coordinator"):
+    """
+    Once the queue is drained, writes the per-task output files (by one worker at a time).
+
+    Returns:
+        True if this call wrote the outputs
+    """
+    from src.evaluation.runner import save_task_results
+
+    if not queue.drained() or not queue.claim_finalize(worker_id):
+        return False
+    counts = queue.counts()
+    if counts["abandoned"]:
+        print(f"Warning: {counts['abandoned']} items failed {config.QUEUE_MAX_ATTEMPTS} leases and have no result")
+    for model_name in models:
+        unserved = queue.counts(model_name)["unserved"]
+        if unserved:
+            print(f"Warning: {unserved} items of {model_name} have no result: no live worker could initialize it. "
+                  f"Run `python main.py --worker {run_id}` where it is reachable to add them.")
+    for spec in plan:
+        for model_name in models:
+            results = queue.results(model_name, spec.task_name)
+            if results:
+                save_task_results(model_name, spec, results, run_id)
+        # Keeps the finalize claim from expiring while a large run is written
+        queue.heartbeat(worker_id)
+    queue.mark_finalized(worker_id)
+    print(f"Queue: {counts['done']} items written for run {run_id}")
+    return True
+
+
+def run_queue(run_id, models, plan):
+    """Queue mode of run_evaluation: publishes the plan, works on it and writes the outputs."""
+    from src.evaluation.scheduler import DatasetCache
+
+    queue = WorkQueue(get_queue_path(run_id))
+    datasets = DatasetCache()
+    worker_id = f"coordinator-{socket.gethostname()}-{os.getpid()}"
+    try:
+        publish_plan(queue, models, plan, datasets)
+        print(f"Add workers at any time with: python main.py --worker {run_id}")
+        run_worker(queue, models, plan, datasets, worker_id)
+        # Another worker may be writing the outputs; the leaderboard must wait for it.
+        # A claim whose holder died expires, and then this process writes them.
+        waiting = False
+        while not queue.finalized() and not finalize_queue(queue, run_id, plan, config.ENABLED_MODELS, worker_id):
+            if not waiting:
+                print("Queue: waiting for another worker to write the outputs")
+                waiting = True
+            time.sleep(config.QUEUE_POLL_INTERVAL)
+        for worker, host, pid, _, completed in queue.workers():
+            print(f"  {worker}: {completed} items")
+    finally:
+        queue.close()
+
+
+def run_queue_worker(run_id):
+    """Joins a running queue-mode run as an extra worker (`main.py --worker RUN_ID`)."""
+    from src.models import get_model
+    from src.evaluation.journal import load_run_config
+    from src.evaluation.scheduler import build_plan, DatasetCache
+
+    load_run_config(run_id)
+    path = get_queue_path(run_id)
+    if not os.path.exists(path):
+        print(f"No work queue for run {run_id} ({path})")
+        return
+    models = []
+    for model_name in config.ENABLED_MODELS:
+        try:
+            models.append(get_model(model_name))
+        except Exception as e:
+            print(f"Failed to initialize {model_name}: {e}")
+    plan = build_plan()
+    queue = WorkQueue(path)
+    try:
+        worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        run_worker(queue, models, plan, DatasetCache(), worker_id)
+        finalize_queue(queue, run_id, plan, config.ENABLED_MODELS, worker_id)
+    finally:
+        queue.close()
@@ -0,0 +1,2 @@
+
+from .server import serve, MockSettings, deterministic_answer
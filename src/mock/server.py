@@ -0,0 +1,250 @@
+"""
+Local OpenAI-compatible server for measuring the harness without real API calls.
+
+Serves POST .../chat/completions and .../completions (any path prefix, so
+mlapi.run-style /<uuid>/v1/... URLs work), with streaming, seeded latency
+distributions, error/429/504 injection and answers derived from the prompt.
+
+    python -m src.mock.server --port 8001 --latency-median 0.3 --throttle-rate 0.05
+    MLAPI_BASE_URL=http://127.0.0.1:8001 python main.py
+"""
+
+import re
+import sys
+import math
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from dataclasses import dataclass, asdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+@dataclass
+class MockSettings:
+    latency_median: float = 0.2   # Seconds; request latency is log-normal around this
+    latency_sigma: float = 0.5
+    ttft_fraction: float = 0.3    # Share of a streamed response's latency before the first token
+    stream_chunks: int = 8
+    error_rate: float = 0.0       # 500 responses
+    throttle_rate: float = 0.0    # 429 responses with Retry-After
+    timeout_rate: float = 0.0     # 504 responses (after the drawn latency)
+    retry_after: float = 1.0
+    seed: int = 0
+
+
+# Answer format each prompt asks for (see src/evaluation/prompts.py)
+OPTION_MARKERS = [("(A-D)", "ABCD"), ("(1-4)", "1234"), ("(1 또는 2)", "12"), ("0을 선택", "01"), ("부정: 0", "01")]
+LONG_ANSWER = "모의 서버 응답입니다. 질문을 단계별로 검토한 뒤 결론을 정리했습니다. " * 8
+
+
+def _digest(text):
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest(), 16)
+
+
+def _options(prompt):
+    for marker, options in OPTION_MARKERS:
+        if marker in prompt:
+            return options
+    return "1234"
+
+
+def deterministic_answer(prompt):
+    """Same prompt, same answer: MC prompts get an option, judge prompts a score, others prose."""
+    digest = _digest(prompt)
+    if "점수:" in prompt and "이유:" in prompt:
+        return f"점수: {digest % 5 + 1}\n이유: 모의 평가입니다."
+    if "### 문제" in prompt:
+        blocks = re.split(r"### 문제 \d+\n", prompt)[1:]
+        answers = [_options(block)[_digest(block) % len(_options(block))] for block in blocks]
+        return json.dumps({"answers": answers})
+    if "정답" in prompt:
+        options = _options(prompt)
+        return f"정답: {options[digest % len(options)]}"
+    return LONG_ANSWER
+
+
+class MockState:
+    def __init__(self, settings):
+        self.settings = settings
+        self._rng = random.Random(settings.seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.statuses = {}
+
+    def draw(self):
+        """Returns (latency, fault status or None) for the next request."""
+        s = self.settings
+        with self._lock:
+            self.requests += 1
+            latency = self._rng.lognormvariate(math.log(s.latency_median), s.latency_sigma) if s.latency_median > 0 else 0.0
+            roll = self._rng.random()
+        if roll < s.error_rate:
+            return latency, 500
+        if roll < s.error_rate + s.throttle_rate:
+            return latency, 429
+        if roll < s.error_rate + s.throttle_rate + s.timeout_rate:
+            return latency, 504
+        return latency, None
+
+    def count(self, status):
+        with self._lock:
+            self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "statuses": dict(self.statuses), "settings": asdict(self.settings)}
+
+
+def _usage(prompt, text):
+    # Rough token counts, enough for telemetry plumbing
+    return {"prompt_tokens": len(prompt) // 2, "completion_tokens": max(len(text) // 2, 1),
+            "total_tokens": len(prompt) // 2 + max(len(text) // 2, 1),
+            "completion_tokens_details": {"reasoning_tokens": 0}}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, obj, headers=None):
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self.state.count(status)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            return self._send_json(200, self.state.stats())
+        if self.path.rstrip("/").endswith("/models"):
+            return self._send_json(200, {"data": [{"id": "mock"}]})
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.endswith("/chat/completions"):
+            prompt = "\n".join(str(message.get("content", "")) for message in payload.get("messages", []))
+        elif self.path.endswith("/completions"):
+            prompt = str(payload.get("prompt", ""))
+        else:
+            return self._send_json(404, {"error": {"message": "not found"}})
+
+        latency, fault = self.state.draw()
+        if fault == 429:
+            return self._send_json(429, {"error": {"message": "rate limited"}},
+                                   {"Retry-After": str(self.state.settings.retry_after)})
+        if fault == 500:
+            return self._send_json(500, {"error": {"message": "injected error"}})
+        if fault == 504:
+            time.sleep(latency)
+            return self._send_json(504, {"error": {"message": "gateway timeout"}})
+
+        text = deterministic_answer(prompt)
+        if payload.get("stream"):
+            return self._stream(payload, prompt, text, latency)
+
+        time.sleep(latency)
+        if self.path.endswith("/chat/completions"):
+            choice = {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}
+            if payload.get("logprobs"):
+                choice["logprobs"] = self._logprobs(prompt, text)
+        else:
+            choice = {"index": 0, "text": text, "finish_reason": "stop"}
+        self._send_json(200, {"id": "mock", "object": "chat.completion", "model": payload.get("model"),
+                              "choices": [choice], "usage": _usage(prompt, text)})
+
+    def _logprobs(self, prompt, text):
+        answer = text.split(": ")[-1][:1]
+        top = [{"token": option, "logprob": -0.1 if option == answer else -3.0} for option in _options(prompt)]
+        return {"content": [{"token": answer, "logprob": -0.1, "top_logprobs": top}]}
+
+    def _stream(self, payload, prompt, text, latency):
+        chunks = max(self.state.settings.stream_chunks, 1)
+        size = math.ceil(len(text) / chunks)
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        ttft = latency * self.state.settings.ttft_fraction
+        gap = (latency - ttft) / max(len(pieces), 1)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.state.count(200)
+
+        def _write(data):
+            body = data.encode("utf-8")
+            self.wfile.write(f"{len(body):x}\r\n".encode() + body + b"\r\n")
+            self.wfile.flush()
+
+        try:
+            time.sleep(ttft)
+            for piece in pieces:
+                _write("data: " + json.dumps({"choices": [{"index": 0, "delta": {"content": piece}}]}, ensure_ascii=False) + "\n\n")
+                time.sleep(gap)
+            if (payload.get("stream_options") or {}).get("include_usage"):
+                _write("data: " + json.dumps({"choices": [], "usage": _usage(prompt, text)}) + "\n\n")
+            _write("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading (early stop on a confident answer)
+            self.close_connection = True
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients drop keep-alive connections and cancel streams; that is not a server error
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def serve(settings=None, host="127.0.0.1", port=0):
+    """
+    Starts the mock server on a background thread.
+
+    Returns:
+        The running ThreadingHTTPServer (server.server_port has the bound port)
+    """
+    handler = type("BoundMockHandler", (MockHandler,), {"state": MockState(settings or MockSettings())})
+    server = _MockHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_settings_arguments(parser):
+    for name, default in asdict(MockSettings()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+
+
+def settings_from_args(args):
+    return MockSettings(**{name: getattr(args, name) for name in asdict(MockSettings())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock OpenAI-compatible server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    server = serve(settings_from_args(args), args.host, args.port)
+    print(f"Mock server listening on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,20 @@
-
+import importlib
 from .base import BaseModel
-from .helpy import HelpyProModel, HelpyEduModel
-from .mlapi import MLApiModel
-from .openai import OpenAIModel
-# from .gemini import GeminiModel  # Temporarily disabled
-# from .elice import EliceModel  # Replaced by HelpyProModel, HelpyEduModel
+from .registry import MODEL_REGISTRY, get_model, get_model_class
+
+# Provider classes are imported on first access, so `from src.models import MLApiModel`
+# does not load the SDKs of the other providers
+_PROVIDERS = {
+    "HelpyProModel": ".helpy",
+    "HelpyEduModel": ".helpy",
+    "MLApiModel": ".mlapi",
+    "OpenAIModel": ".openai",
+    # "GeminiModel": ".gemini",  # Temporarily disabled
+    # "EliceModel": ".elice",  # Replaced by HelpyProModel, HelpyEduModel
+}
+
+
+def __getattr__(name):
+    if name in _PROVIDERS:
+        return getattr(importlib.import_module(_PROVIDERS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,15 +1,26 @@
 
+import json
+import asyncio
 from abc import ABC, abstractmethod
+from .cache import get_cache
 
 class BaseModel(ABC):
+    # Adapters whose endpoint returns top_logprobs set this and implement _option_logprobs
+    supports_logprobs = False
+
     def __init__(self, model_name: str, config: dict = None):
         self.model_name = model_name
         self.config = config or {}
 
-    @abstractmethod
+    @property
+    def endpoint(self) -> str:
+        # HTTP adapters set api_url; SDK-based adapters are identified by model name alone
+        return getattr(self, "api_url", "")
+
     def generate(self, prompt: str, **kwargs) -> str:
         """
         Generates a response for the given prompt.
+        Identical requests are served from the response cache unless it is bypassed.
         
         Args:
             prompt: Input text
@@ -18,4 +29,64 @@ class BaseModel(ABC):
         Returns:
             Generated text
         """
+        cache = get_cache()
+        if cache is None:
+            return self._generate(prompt, **kwargs)
+
+        key = cache.make_key(self.model_name, self.endpoint, prompt, kwargs)
+        return cache.get_or_compute(key, self.model_name, lambda: self._generate(prompt, **kwargs))
+
+    @abstractmethod
+    def _generate(self, prompt: str, **kwargs) -> str:
+        """
+        Sends the request to the provider. Implemented by each adapter.
+        Failures are returned as "Error: ..." strings, which are never cached.
+        """
         pass
+
+    def score_options(self, prompt: str, options: list, **kwargs) -> dict:
+        """
+        Picks the answer from the probabilities the model assigns to each option token
+        in a single one-token completion.
+        
+        Args:
+            prompt: Input text
+            options: option tokens, e.g. ["A", "B", "C", "D"] or ["0", "1"]
+            
+        Returns:
+            dict with "prediction" (most likely option, or an "Error: ..." string),
+            "distribution" ({option: probability}) and the raw "top_logprobs"
+        """
+        def _compute():
+            try:
+                return json.dumps(self._option_logprobs(prompt, options, **kwargs), ensure_ascii=False)
+            except Exception as e:
+                return f"Error: {e}"
+
+        cache = get_cache()
+        if cache is None:
+            raw = _compute()
+        else:
+            key = cache.make_key(self.model_name, self.endpoint, prompt, {**kwargs, "score_options": options})
+            raw = cache.get_or_compute(key, self.model_name, _compute)
+
+        if raw.startswith("Error:"):
+            return {"prediction": raw, "distribution": None, "top_logprobs": None}
+        return json.loads(raw)
+
+    def _option_logprobs(self, prompt: str, options: list, **kwargs) -> dict:
+        raise NotImplementedError(f"{type(self).__name__} does not expose logprobs")
+
+    def batch_request(self, prompt: str, **kwargs) -> dict:
+        """
+        Returns the chat/completions request body for prompt, for offline batch jobs.
+        Implemented by adapters that talk to an OpenAI-compatible endpoint.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batch jobs")
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        """
+        Async variant of generate(). Runs the blocking call in the event loop's executor
+        so several requests can be in flight at once.
+        """
+        return await asyncio.to_thread(self.generate, prompt, **kwargs)
@@ -0,0 +1,180 @@
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import config
+
+CACHE_MODES = ["use", "refresh", "bypass"]
+
+
+class _Flight:
+    """An in-progress computation that concurrent identical requests wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+
+
+class ResponseCache:
+    """
+    Disk-backed (SQLite) cache of model responses keyed by model, endpoint, prompt and
+    generation params.
+
+    Modes:
+        use: serve stored responses, store new ones
+        refresh: ignore entries written before this process started, overwrite them
+        bypass: never read or write (handled by get_cache returning None)
+    """
+
+    def __init__(self, path, mode="use", max_age_days=None, max_entries=None):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Cache mode must be one of {CACHE_MODES}")
+        self.path = path
+        self.mode = mode
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._started_at = time.time()
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, created_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_created ON responses(created_at)")
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(model, endpoint, prompt, params):
+        # Non-serialisable params (callbacks etc.) don't change the request body
+        params = {k: v for k, v in params.items() if not callable(v)}
+        raw = json.dumps([model, endpoint, prompt, params], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_cacheable(response):
+        return bool(response) and not response.startswith("Error:")
+
+    def _lookup(self, key):
+        row = self._conn.execute(
+            "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        response, created_at = row
+        if self.mode == "refresh" and created_at < self._started_at:
+            return None
+        if self.max_age_days is not None and created_at < time.time() - self.max_age_days * 86400:
+            return None
+        return response
+
+    def restart_refresh(self):
+        """In refresh mode, treats everything stored so far (this process included) as stale."""
+        with self._lock:
+            self._started_at = time.time()
+
+    def get(self, key):
+        with self._lock:
+            return self._lookup(key)
+
+    def put(self, key, model, response):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, response, time.time())
+            )
+            self._conn.commit()
+
+    def get_or_compute(self, key, model, compute):
+        """
+        Returns the cached response for key, or calls compute() once and stores its result.
+        Concurrent callers with the same key wait for the first one instead of calling compute again.
+        """
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+
+        if not leader:
+            flight.event.wait()
+            if flight.value is not None:
+                with self._lock:
+                    self.hits += 1
+                return flight.value
+            # The leader raised; make our own attempt
+            return compute()
+
+        try:
+            with self._lock:
+                self.misses += 1
+            value = compute()
+            if self.is_cacheable(value):
+                self.put(key, model, value)
+            flight.value = value
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.event.set()
+
+    def evict(self):
+        """Drops entries older than max_age_days and the oldest entries beyond max_entries."""
+        with self._lock:
+            if self.max_age_days is not None:
+                cutoff = time.time() - self.max_age_days * 86400
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Returns the process-wide response cache, or None when caching is bypassed."""
+    global _cache
+    if config.CACHE_MODE == "bypass":
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.mode != config.CACHE_MODE:
+            _cache = ResponseCache(
+                config.CACHE_PATH,
+                mode=config.CACHE_MODE,
+                max_age_days=config.CACHE_MAX_AGE_DAYS,
+                max_entries=config.CACHE_MAX_ENTRIES
+            )
+        return _cache
+
+
+def print_cache_stats():
+    if _cache is None:
+        return
+    stats = _cache.stats()
+    print(f"Response cache: {stats['hits']} hits, {stats['misses']} misses ({stats['entries']} entries stored)")
@@ -0,0 +1,366 @@
+
+import os
+import json
+import math
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+import config
+from .ratelimit import THROTTLE_STATUSES, get_limiter, parse_retry_after
+from .telemetry import track
+from .hedging import latency_key, get_tracker, get_budget, hedged_call
+
+# Characters before the newest streamed chunk that stop_when sees again, so an answer
+# split across chunks ("정답:" | " 2") is still found
+STOP_LOOKBACK = 64
+
+# Override (e.g. with a local mock server from src/mock/server.py) via the environment
+MLAPI_BASE_URL = os.getenv("MLAPI_BASE_URL", "https://mlapi.run")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _pool_size():
+    # All enabled models may be running at full concurrency against the same host
+    per_model = [config.MODEL_CONCURRENCY.get(name, config.MAX_CONCURRENCY) for name in config.ENABLED_MODELS]
+    return max(sum(per_model), config.MAX_CONCURRENCY, 1)
+
+
+def new_session(pool_size):
+    """Creates a keep-alive session that keeps up to pool_size open connections per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """Returns the process-wide keep-alive session shared by every HTTP model adapter."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = new_session(_pool_size())
+        return _session
+
+
+def connection_stats():
+    """
+    Connection reuse statistics for the shared session.
+
+    Returns:
+        dict with requests sent, connections opened and the fraction of requests
+        that reused an already open connection
+    """
+    stats = {"requests": 0, "connections": 0}
+    if _session is None:
+        return {**stats, "reuse_rate": 0.0}
+
+    for adapter in set(_session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats["requests"] += pool.num_requests
+            stats["connections"] += pool.num_connections
+
+    reused = max(stats["requests"] - stats["connections"], 0)
+    stats["reuse_rate"] = reused / stats["requests"] if stats["requests"] else 0.0
+    return stats
+
+
+def print_connection_stats():
+    stats = connection_stats()
+    if stats["requests"]:
+        print(f"HTTP connections: {stats['connections']} opened for {stats['requests']} requests "
+              f"({stats['reuse_rate']:.1%} reused)")
+
+
+def option_distribution(top_logprobs, options):
+    """
+    Turns the top_logprobs of a single generated token into a distribution over options.
+    Tokens are matched after stripping whitespace/markup and upper-casing, so " A", "a"
+    and "**A" all count towards option "A". Options outside the top tokens get 0.
+    """
+    mass = {option: 0.0 for option in options}
+    lookup = {str(option).upper(): option for option in options}
+    for entry in top_logprobs:
+        token = entry["token"].strip().strip("*().:").upper()
+        if token in lookup:
+            mass[lookup[token]] += math.exp(entry["logprob"])
+    total = sum(mass.values())
+    if total == 0:
+        raise ValueError(f"None of the options {options} among top logprobs")
+    return {option: p / total for option, p in mass.items()}
+
+
+def parse_chat_result(result: dict) -> str:
+    """Extracts the generated text from a chat/completions response body."""
+    # Handle different response formats
+    if "choices" in result:
+        message = result["choices"][0]["message"]
+        content = message.get("content")
+        # Some models (like gpt-oss-20b) return content in reasoning_content
+        if content is None:
+            content = message.get("reasoning_content", "")
+        return content.strip() if content else ""
+    elif "text" in result:
+        return result["text"].strip()
+    else:
+        return str(result)
+
+
+class ChatCompletionsClient:
+    """OpenAI-compatible chat/completions client built on the shared connection pool."""
+
+    def __init__(self, base_url: str, api_key: str, api_model_name: str, timeout: int = 600):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.api_model_name = api_model_name
+        self.timeout = timeout
+        self.session = None  # Own session (e.g. for preflight); None uses the shared one
+
+    def http(self):
+        return self.session or get_session()
+
+    @property
+    def chat_url(self):
+        return f"{self.base_url}/chat/completions"
+
+    @property
+    def completions_url(self):
+        return f"{self.base_url}/completions"
+
+    def headers(self):
+        return {
+            "accept": "application/json",
+            "content-type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+
+    def build_chat_payload(self, prompt: str, **kwargs) -> dict:
+        payload = {
+            "model": self.api_model_name,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "max_completion_tokens": kwargs.get("max_tokens", 1024),
+            "temperature": kwargs.get("temperature", 0.7)
+        }
+        if "enable_thinking" in kwargs:
+            payload["chat_template_kwargs"] = {"enable_thinking": kwargs["enable_thinking"]}
+        return payload
+
+    def send(self, url: str, payload: dict, stream: bool = False, trace=None, adaptive: bool = True):
+        """
+        Sends the request through the endpoint's adaptive rate limiter, retrying
+        throttled (429/502/503/504) responses and dropped connections. With
+        ADAPTIVE_TIMEOUTS, timeouts follow the endpoint's observed latency and a
+        timed-out request is retried with a doubled read timeout while the run's
+        duplicate budget lasts.
+
+        Args:
+            trace: optional telemetry RequestTrace that receives status and retry count
+            adaptive: False forces the flat timeout
+
+        Returns:
+            The successful requests.Response (unread when stream=True)
+        """
+        limiter = get_limiter(url)
+        tracker = get_tracker(latency_key(url, payload))
+        connect_timeout, read_timeout = self.timeout, self.timeout
+        if adaptive and config.ADAPTIVE_TIMEOUTS and get_budget().available():
+            connect_timeout, read_timeout = tracker.timeouts(self.timeout) or (self.timeout, self.timeout)
+        for attempt in range(config.MAX_RETRIES + 1):
+            if trace:
+                trace.retries = attempt
+            limiter.acquire()
+            if trace and attempt == 0:
+                # Latency excludes time spent queued behind the rate limiter
+                trace.sent()
+            try:
+                response = self.http().post(url, headers=self.headers(), json=payload,
+                                              timeout=(connect_timeout, read_timeout), stream=stream)
+            except requests.exceptions.ReadTimeout:
+                if read_timeout >= self.timeout or attempt == config.MAX_RETRIES or not get_budget().spend("timeout"):
+                    raise
+                read_timeout = min(read_timeout * 2, self.timeout)
+                continue
+            except requests.exceptions.ConnectionError:
+                if attempt == config.MAX_RETRIES:
+                    raise
+                limiter.on_throttle()
+                time.sleep(min(2 ** attempt, 30))
+                continue
+
+            if response.status_code in THROTTLE_STATUSES and attempt < config.MAX_RETRIES:
+                limiter.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+                response.close()
+                continue
+
+            if trace:
+                trace.status = response.status_code
+            response.raise_for_status()
+            limiter.on_success()
+            tracker.observe_headers(response.elapsed.total_seconds())
+            return response
+
+    def post(self, url: str, payload: dict, hedge: bool = True) -> dict:
+        tracker = get_tracker(latency_key(url, payload))
+
+        def _call(cancelled):
+            with track(self.api_model_name, url) as trace:
+                result = self.send(url, payload, trace=trace).json()
+                trace.set_usage(result.get("usage"))
+                tracker.observe(trace.elapsed())
+                return result
+
+        return hedged_call(tracker, _call, hedge=hedge)
+
+    def stream_chat(self, prompt: str, stop_when=None, **kwargs) -> str:
+        """
+        Streams a chat completion (server-sent events) and returns the text received.
+
+        Args:
+            stop_when: optional callable(text) -> truthy; the stream is cancelled as soon
+                       as it returns a truthy value. It sees the newest chunk plus the
+                       STOP_LOOKBACK characters before it, not the whole text, so each
+                       chunk costs the same however long the response gets
+        """
+        payload = self.build_chat_payload(prompt, **kwargs)
+        payload["stream"] = True
+        if config.STREAM_USAGE:
+            payload["stream_options"] = {"include_usage": True}
+
+        tracker = get_tracker(latency_key(self.chat_url, payload))
+
+        def _call(cancelled):
+            try:
+                return self._stream(payload, tracker, cancelled, stop_when)
+            except requests.exceptions.ConnectionError as e:
+                # An adaptive read timeout that fires mid-stream surfaces here rather than in send()
+                if not (e.args and isinstance(e.args[0], ReadTimeoutError)) or not get_budget().spend("timeout"):
+                    raise
+                return self._stream(payload, tracker, cancelled, stop_when, adaptive=False)
+
+        return hedged_call(tracker, _call)
+
+    def _stream(self, payload: dict, tracker, cancelled, stop_when=None, adaptive=True) -> str:
+        content, reasoning = [], []
+        tail, tail_source = "", None
+        with track(self.api_model_name, self.chat_url) as trace:
+            response = self.send(self.chat_url, payload, stream=True, trace=trace, adaptive=adaptive)
+            # SSE is always UTF-8; without a charset requests would decode text/* as ISO-8859-1
+            response.encoding = "utf-8"
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if cancelled.is_set():
+                        # A hedged duplicate already answered
+                        break
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    # With include_usage the last chunk carries usage and no choices
+                    trace.set_usage(chunk.get("usage"))
+                    if not chunk.get("choices"):
+                        continue
+                    delta = chunk["choices"][0].get("delta") or {}
+                    if delta.get("content"):
+                        content.append(delta["content"])
+                    # Some models (like gpt-oss-20b) stream their answer as reasoning_content
+                    if delta.get("reasoning_content"):
+                        reasoning.append(delta["reasoning_content"])
+                    if content or reasoning:
+                        trace.first_token()
+                    # The answer is read from content, or from reasoning until content starts
+                    source, piece = (content, delta.get("content")) if content else (reasoning, delta.get("reasoning_content"))
+                    if stop_when and piece:
+                        if source is not tail_source:
+                            tail, tail_source = "", source
+                        tail = tail[-STOP_LOOKBACK:] + piece
+                        if stop_when(tail):
+                            break
+            finally:
+                # Closing mid-stream drops the connection, which cancels generation server-side
+                response.close()
+            tracker.observe(trace.elapsed())
+
+        return ("".join(content) or "".join(reasoning)).strip()
+
+    def chat(self, prompt: str, **kwargs) -> str:
+        if kwargs.get("stream"):
+            return self.stream_chat(prompt, **kwargs)
+
+        return parse_chat_result(self.post(self.chat_url, self.build_chat_payload(prompt, **kwargs)))
+
+    def option_logprobs(self, prompt: str, options: list, **kwargs) -> dict:
+        """
+        Requests a single-token completion with top_logprobs and scores the options.
+        Reasoning models that spend the token on hidden reasoning return no logprobs
+        and raise here; use generation mode for them.
+        """
+        kwargs.update(max_tokens=1, temperature=0)
+        payload = self.build_chat_payload(prompt, **kwargs)
+        payload["logprobs"] = True
+        payload["top_logprobs"] = config.TOP_LOGPROBS
+        result = self.post(self.chat_url, payload)
+
+        logprobs = (result["choices"][0].get("logprobs") or {}).get("content")
+        if not logprobs:
+            raise ValueError("Endpoint returned no logprobs")
+        top_logprobs = [{"token": entry["token"], "logprob": entry["logprob"]} for entry in logprobs[0]["top_logprobs"]]
+        distribution = option_distribution(top_logprobs, options)
+        return {
+            "prediction": max(distribution, key=distribution.get),
+            "distribution": distribution,
+            "top_logprobs": top_logprobs
+        }
+
+    def complete(self, prompt: str, **kwargs) -> str:
+        payload = {
+            "model": self.api_model_name,
+            "prompt": prompt,
+            "max_tokens": kwargs.get("max_tokens", 1024),
+            "temperature": kwargs.get("temperature", 0.7)
+        }
+        result = self.post(self.completions_url, payload)
+        return result["choices"][0]["text"].strip()
+
+    # Batch API (OpenAI /files + /batches)
+
+    def upload_batch_file(self, path: str) -> str:
+        """Uploads a batch request JSONL file and returns its file id."""
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        with open(path, "rb") as f:
+            response = self.http().post(f"{self.base_url}/files", headers=headers, data={"purpose": "batch"},
+                                          files={"file": (path.split("/")[-1], f)}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["id"]
+
+    def create_batch(self, input_file_id: str, endpoint: str = "/v1/chat/completions") -> dict:
+        payload = {
+            "input_file_id": input_file_id,
+            "endpoint": endpoint,
+            "completion_window": config.BATCH_COMPLETION_WINDOW
+        }
+        return self.post(f"{self.base_url}/batches", payload, hedge=False)
+
+    def get_batch(self, batch_id: str) -> dict:
+        response = self.http().get(f"{self.base_url}/batches/{batch_id}", headers=self.headers(), timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def download_file(self, file_id: str, path: str):
+        response = self.http().get(f"{self.base_url}/files/{file_id}/content", headers=self.headers(),
+                                     timeout=self.timeout, stream=True)
+        response.raise_for_status()
+        with open(path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
@@ -1,7 +1,7 @@
 
 import os
-import requests
 from .base import BaseModel
+from .client import ChatCompletionsClient
 
 class EliceModel(BaseModel):
     def __init__(self, model_name: str, api_key: str = None):
@@ -9,23 +9,11 @@ class EliceModel(BaseModel):
         self.api_key = api_key or os.getenv("ELICE_API_KEY")
         if not self.api_key:
             raise ValueError("ELICE_API_KEY is not set.")
-        self.api_url = "https://api.elice.io/v1/completions" # Placeholder URL
+        self.client = ChatCompletionsClient("https://api.elice.io/v1", self.api_key, model_name) # Placeholder URL
+        self.api_url = self.client.completions_url
 
-    def generate(self, prompt: str, **kwargs) -> str:
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": self.model_name,
-            "prompt": prompt,
-            "max_tokens": kwargs.get("max_tokens", 1024),
-            "temperature": kwargs.get("temperature", 0.7)
-        }
-        
+    def _generate(self, prompt: str, **kwargs) -> str:
         try:
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json()["choices"][0]["text"].strip() # Placeholder response format
+            return self.client.complete(prompt, **kwargs) # Placeholder response format
         except Exception as e:
             return f"Error: {e}"
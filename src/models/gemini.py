@@ -12,7 +12,7 @@ class GeminiModel(BaseModel):
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel(model_name)
 
-    def generate(self, prompt: str, **kwargs) -> str:
+    def _generate(self, prompt: str, **kwargs) -> str:
         try:
             # Gemini generation config
             generation_config = genai.types.GenerationConfig(
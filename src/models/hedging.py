@@ -0,0 +1,173 @@
+
+import queue
+import threading
+from collections import deque
+import config
+
+
+def latency_key(url, payload):
+    """
+    Requests of different shapes have different latencies (a 1-token logprob call vs a
+    4096-token LogicKor answer), so they are tracked separately per endpoint.
+    """
+    max_tokens = payload.get("max_completion_tokens") or payload.get("max_tokens")
+    return f"{url}|stream={bool(payload.get('stream'))}|max_tokens={max_tokens}"
+
+
+def _quantile(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+class LatencyTracker:
+    """Rolling window of recent successful latencies for one endpoint and request shape."""
+
+    def __init__(self, window):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._headers = deque(maxlen=window)
+
+    def observe(self, latency):
+        """Full request latency (until the last byte, or until a stream was stopped)."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def observe_headers(self, elapsed):
+        """Time until the response headers arrived; an upper bound on connection setup."""
+        with self._lock:
+            self._headers.append(elapsed)
+
+    def _snapshot(self):
+        with self._lock:
+            return list(self._latencies), list(self._headers)
+
+    def timeouts(self, max_timeout):
+        """
+        Returns (connect, read) timeouts from the observed p99 latencies, or None
+        until TIMEOUT_MIN_SAMPLES requests have been seen.
+        """
+        latencies, headers = self._snapshot()
+        if len(latencies) < config.TIMEOUT_MIN_SAMPLES or len(headers) < config.TIMEOUT_MIN_SAMPLES:
+            return None
+        connect = config.TIMEOUT_MULTIPLIER * _quantile(headers, 0.99)
+        read = config.TIMEOUT_MULTIPLIER * _quantile(latencies, 0.99)
+        return (min(max(connect, config.CONNECT_TIMEOUT_MIN), config.CONNECT_TIMEOUT_MAX, max_timeout),
+                min(max(read, config.TIMEOUT_MIN), max_timeout))
+
+    def hedge_delay(self):
+        """The p95 latency after which a duplicate is sent, or None without enough samples."""
+        latencies, _ = self._snapshot()
+        if len(latencies) < config.TIMEOUT_MIN_SAMPLES:
+            return None
+        return _quantile(latencies, 0.95)
+
+
+class DuplicateBudget:
+    """
+    Caps duplicate requests (hedges and retries after an adaptive timeout) at
+    DUPLICATE_BUDGET times the number of requests made in this run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.spent = {"hedge": 0, "timeout": 0}
+        self.hedges_won = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def available(self):
+        with self._lock:
+            return sum(self.spent.values()) + 1 <= config.DUPLICATE_BUDGET * self.requests
+
+    def spend(self, kind):
+        with self._lock:
+            if sum(self.spent.values()) + 1 > config.DUPLICATE_BUDGET * self.requests:
+                return False
+            self.spent[kind] += 1
+            return True
+
+    def hedge_won(self):
+        with self._lock:
+            self.hedges_won += 1
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+_budget = DuplicateBudget()
+
+
+def get_tracker(key):
+    """Returns the shared latency tracker for a latency_key()."""
+    with _trackers_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = LatencyTracker(config.LATENCY_WINDOW)
+            _trackers[key] = tracker
+        return tracker
+
+
+def get_budget():
+    return _budget
+
+
+def hedged_call(tracker, call, hedge=True):
+    """
+    Runs call(cancelled) and, with HEDGE_REQUESTS on, sends a duplicate once it runs past
+    the tracker's p95 latency. The first successful result wins and the other attempt's
+    `cancelled` event is set (streams stop reading; plain requests finish and are dropped).
+
+    Args:
+        call: callable(cancelled: threading.Event) -> result
+        hedge: False for requests that must not be duplicated (e.g. creating a batch)
+    """
+    _budget.record_request()
+    delay = tracker.hedge_delay() if hedge and config.HEDGE_REQUESTS else None
+    if delay is None:
+        return call(threading.Event())
+
+    done = queue.Queue()
+    cancels = []
+
+    def _start():
+        cancelled = threading.Event()
+        index = len(cancels)
+        cancels.append(cancelled)
+
+        def _run():
+            try:
+                done.put((index, True, call(cancelled)))
+            except Exception as e:
+                done.put((index, False, e))
+        threading.Thread(target=_run, daemon=True).start()
+
+    _start()
+    waiting_for_hedge = True
+    finished, error = 0, None
+    while finished < len(cancels):
+        try:
+            index, ok, value = done.get(timeout=delay if waiting_for_hedge else None)
+        except queue.Empty:
+            waiting_for_hedge = False
+            if _budget.spend("hedge"):
+                _start()
+            continue
+        finished += 1
+        if ok:
+            for cancelled in cancels:
+                cancelled.set()
+            if index:
+                _budget.hedge_won()
+            return value
+        error = value
+    raise error
+
+
+def print_hedging_stats():
+    spent = sum(_budget.spent.values())
+    if spent:
+        print(f"Duplicate requests: {_budget.spent['hedge']} hedges ({_budget.hedges_won} won), "
+              f"{_budget.spent['timeout']} timeout retries for {_budget.requests} requests "
+              f"(budget {config.DUPLICATE_BUDGET:.0%})")
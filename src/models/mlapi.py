@@ -1,7 +1,7 @@
 
 import os
-import requests
 from .base import BaseModel
+from .client import ChatCompletionsClient, MLAPI_BASE_URL
 
 
 # Model configurations for mlapi.run
@@ -20,6 +20,8 @@ MLAPI_MODELS = {
 class MLApiModel(BaseModel):
     """Model wrapper for mlapi.run hosted models (gpt-oss-20b, GPT-5.2)"""
 
+    supports_logprobs = True
+
     def __init__(self, model_name: str, api_key: str = None):
         super().__init__(model_name)
         self.api_key = api_key or os.getenv("ELICE_API_KEY")
@@ -31,41 +33,19 @@ class MLApiModel(BaseModel):
         if not model_config:
             raise ValueError(f"Unknown model: {model_name}. Available: {list(MLAPI_MODELS.keys())}")
 
-        self.api_url = f"https://mlapi.run/{model_config['uuid']}/v1/chat/completions"
         self.api_model_name = model_config['api_model_name']
+        self.client = ChatCompletionsClient(f"{MLAPI_BASE_URL}/{model_config['uuid']}/v1", self.api_key, self.api_model_name)
+        self.api_url = self.client.chat_url
 
-    def generate(self, prompt: str, **kwargs) -> str:
-        headers = {
-            "accept": "application/json",
-            "content-type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
-
+    def _generate(self, prompt: str, **kwargs) -> str:
         # OpenAI-compatible chat format
-        payload = {
-            "model": self.api_model_name,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "max_completion_tokens": kwargs.get("max_tokens", 1024),
-            "temperature": kwargs.get("temperature", 0.7)
-        }
-
         try:
-            response = requests.post(self.api_url, headers=headers, json=payload, timeout=600)
-            response.raise_for_status()
-            result = response.json()
-            # Handle different response formats
-            if "choices" in result:
-                message = result["choices"][0]["message"]
-                content = message.get("content")
-                # Some models (like gpt-oss-20b) return content in reasoning_content
-                if content is None:
-                    content = message.get("reasoning_content", "")
-                return content.strip() if content else ""
-            elif "text" in result:
-                return result["text"].strip()
-            else:
-                return str(result)
+            return self.client.chat(prompt, **kwargs)
         except Exception as e:
             return f"Error: {e}"
+
+    def batch_request(self, prompt: str, **kwargs) -> dict:
+        return self.client.build_chat_payload(prompt, **kwargs)
+
+    def _option_logprobs(self, prompt: str, options: list, **kwargs) -> dict:
+        return self.client.option_logprobs(prompt, options, **kwargs)
@@ -11,7 +11,7 @@ class OpenAIModel(BaseModel):
             raise ValueError("OPENAI_API_KEY is not set.")
         self.client = OpenAI(api_key=api_key)
 
-    def generate(self, prompt: str, **kwargs) -> str:
+    def _generate(self, prompt: str, **kwargs) -> str:
         try:
             response = self.client.chat.completions.create(
                 model=self.model_name,
@@ -0,0 +1,203 @@
+
+import os
+import json
+import time
+import statistics
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import config
+from .registry import get_model
+from .ratelimit import get_limiter
+from .client import ChatCompletionsClient, new_session
+
+# Tiny request: preflight measures the endpoint, not generation length
+PING_PROMPT = "ping"
+PING_KWARGS = {"max_tokens": 8, "temperature": 0}
+
+WARM_PINGS = 3
+RAMP_LEVELS = [1, 2, 4, 8, 16, 32]
+REQUESTS_PER_SLOT = 2     # Requests per in-flight slot at each ramp level
+MIN_GAIN = 0.15           # Stop ramping once throughput improves less than this
+LATENCY_FACTOR = 4.0      # ... or p95 latency exceeds this multiple of the warm latency
+
+
+def _ping(model):
+    start = time.perf_counter()
+    # _generate skips the response cache, so every ping reaches the endpoint
+    output = model._generate(PING_PROMPT, **PING_KWARGS)
+    return time.perf_counter() - start, not output.startswith("Error:"), output
+
+
+def _ramp_level(model, concurrency, limiter):
+    throttled = limiter.throttled if limiter else 0
+    count = concurrency * REQUESTS_PER_SLOT
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: _ping(model), range(count)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, ok, _ in results if ok)
+    return {
+        "concurrency": concurrency,
+        "requests": count,
+        "errors": count - len(latencies),
+        "throttled": (limiter.throttled - throttled) if limiter else 0,
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "p50": statistics.median(latencies) if latencies else None,
+        "p95": latencies[min(int(0.95 * len(latencies)), len(latencies) - 1)] if latencies else None
+    }
+
+
+def probe_model(model):
+    """
+    Measures one endpoint: cold latency (first request), warm latency (median of the
+    next few) and a concurrency ramp. The knee is the last level whose throughput still
+    grew by MIN_GAIN without errors, throttling or a latency blow-up.
+
+    HTTP adapters probe on their own session with a pool as large as the top ramp level:
+    the shared pool is sized for the configured concurrency, and connections beyond it
+    would be reopened for every request, adding handshakes to the measured latency.
+
+    Returns:
+        dict with ok, latencies, ramp levels and the recommended concurrency
+    """
+    client = getattr(model, "client", None)
+    if not isinstance(client, ChatCompletionsClient):
+        return _probe(model)
+    client.session = new_session(max(RAMP_LEVELS))
+    try:
+        return _probe(model)
+    finally:
+        client.session.close()
+        client.session = None
+
+
+def _probe(model):
+    result = {"model": model.model_name, "endpoint": model.endpoint,
+              "checked_at": datetime.now().isoformat(timespec="seconds"), "ok": False}
+    limiter = get_limiter(model.endpoint) if model.endpoint else None
+    if limiter:
+        # Measure the endpoint, not our own rate limiter
+        limiter.rate = config.RATE_LIMIT_MAX
+
+    cold, ok, output = _ping(model)
+    result["cold_latency"] = cold
+    if not ok:
+        result["error"] = output
+        return result
+    warm = [_ping(model) for _ in range(WARM_PINGS)]
+    failed = [output for _, ok, output in warm if not ok]
+    if failed:
+        result["error"] = failed[0]
+        return result
+    result["warm_latency"] = statistics.median(latency for latency, _, _ in warm)
+
+    ramp, best = [], None
+    for concurrency in RAMP_LEVELS:
+        level = _ramp_level(model, concurrency, limiter)
+        ramp.append(level)
+        if level["errors"] or level["throttled"] or level["p95"] > result["warm_latency"] * LATENCY_FACTOR:
+            break
+        if best and level["throughput"] < best["throughput"] * (1 + MIN_GAIN):
+            break
+        best = level
+
+    result.update(
+        ok=True,
+        ramp=ramp,
+        concurrency=best["concurrency"] if best else 1,
+        throughput=best["throughput"] if best else None
+    )
+    return result
+
+
+def _load_results():
+    if not os.path.exists(config.PREFLIGHT_PATH):
+        return {}
+    with open(config.PREFLIGHT_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_results(results):
+    os.makedirs(os.path.dirname(config.PREFLIGHT_PATH) or ".", exist_ok=True)
+    tmp_path = config.PREFLIGHT_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, config.PREFLIGHT_PATH)
+
+
+def run_preflight(model_names=None):
+    """
+    Probes every enabled model in parallel, prints a summary and records the
+    results in PREFLIGHT_PATH for the next run.
+
+    Returns:
+        {model name: probe result}
+    """
+    model_names = model_names or config.ENABLED_MODELS
+    results = {}
+    lock = threading.Lock()
+
+    def _probe(model_name):
+        try:
+            result = probe_model(get_model(model_name))
+        except Exception as e:
+            result = {"model": model_name, "ok": False, "error": f"Error: {e}",
+                      "checked_at": datetime.now().isoformat(timespec="seconds")}
+        with lock:
+            results[model_name] = result
+
+    print(f"Preflight: probing {len(model_names)} endpoints...")
+    threads = [threading.Thread(target=_probe, args=(name,), daemon=True) for name in model_names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        while thread.is_alive():
+            thread.join(0.5)
+
+    for model_name in model_names:
+        result = results[model_name]
+        if not result["ok"]:
+            print(f"[FAIL] {model_name}: {result.get('error')}")
+            continue
+        throughput = f"{result['throughput']:.1f} req/s" if result["throughput"] else "-"
+        print(f"[OK]   {model_name}: cold {result['cold_latency']:.2f}s, warm {result['warm_latency']:.2f}s, "
+              f"knee at concurrency {result['concurrency']} ({throughput})")
+
+    saved = _load_results()
+    saved.update(results)
+    _save_results(saved)
+    print(f"Preflight results saved to {config.PREFLIGHT_PATH}")
+    return results
+
+
+def load_preflight(model_name):
+    """Returns the recorded probe result for a model if it is recent enough, else None."""
+    result = _load_results().get(model_name)
+    if not result:
+        return None
+    checked_at = datetime.fromisoformat(result["checked_at"])
+    if datetime.now() - checked_at > timedelta(hours=config.PREFLIGHT_MAX_AGE_HOURS):
+        return None
+    return result
+
+
+def apply_preflight(models):
+    """
+    Starts each model at the concurrency (and request rate) its last preflight found safe.
+    Explicit MODEL_CONCURRENCY entries are left alone.
+    """
+    for model in models:
+        result = load_preflight(model.model_name)
+        if not result:
+            continue
+        if not result["ok"]:
+            print(f"Warning: last preflight of {model.model_name} failed ({result.get('error')})")
+            continue
+        if model.model_name not in config.MODEL_CONCURRENCY:
+            config.MODEL_CONCURRENCY[model.model_name] = min(result["concurrency"], config.MAX_CONCURRENCY)
+        if result.get("throughput") and model.endpoint:
+            limiter = get_limiter(model.endpoint)
+            limiter.rate = min(max(result["throughput"], config.RATE_LIMIT_INITIAL), config.RATE_LIMIT_MAX)
+        print(f"Preflight: {model.model_name} starts at concurrency {config.MODEL_CONCURRENCY[model.model_name]}")
@@ -0,0 +1,107 @@
+
+import time
+import threading
+from email.utils import parsedate_to_datetime
+import config
+
+# Statuses that mean "slow down" rather than "this request is wrong"
+THROTTLE_STATUSES = {429, 502, 503, 504}
+
+
+def parse_retry_after(value):
+    """Parses a Retry-After header (seconds or HTTP date) into seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate adapts to the endpoint (AIMD).
+
+    The rate grows additively with every successful request and is cut
+    multiplicatively when the endpoint throttles (429/502/503/504). A Retry-After
+    hint pauses all callers of the endpoint until it expires.
+    """
+
+    def __init__(self, rate, min_rate, max_rate, increase, decrease):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.throttled = 0
+
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+
+    def _refill(self, now):
+        capacity = max(1.0, self.rate)
+        self._tokens = min(capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = max(self._paused_until - now, (1.0 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after=None):
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            # Requests already in flight fail together; count that as a single signal
+            if now - self._last_decrease >= 1.0 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+            self._tokens = 0.0
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(endpoint):
+    """Returns the shared limiter for an endpoint URL."""
+    with _limiters_lock:
+        limiter = _limiters.get(endpoint)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(
+                rate=config.RATE_LIMIT_INITIAL,
+                min_rate=config.RATE_LIMIT_MIN,
+                max_rate=config.RATE_LIMIT_MAX,
+                increase=config.RATE_LIMIT_INCREASE,
+                decrease=config.RATE_LIMIT_DECREASE
+            )
+            _limiters[endpoint] = limiter
+        return limiter
+
+
+def print_rate_limit_stats():
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    for endpoint, limiter in limiters.items():
+        if limiter.throttled:
+            print(f"Rate limit {endpoint}: {limiter.rate:.1f} req/s after {limiter.throttled} throttled responses")
@@ -0,0 +1,29 @@
+
+import importlib
+
+# Model name -> "module:Class". Provider modules (and the SDKs they pull in, e.g. openai)
+# are imported only when a model that needs them is created.
+MODEL_REGISTRY = {
+    "helpy-pro": "src.models.helpy:HelpyProModel",
+    "helpy-edu": "src.models.helpy:HelpyEduModel",
+    "gpt-oss-20b": "src.models.mlapi:MLApiModel",
+    "gpt-5.2": "src.models.mlapi:MLApiModel",
+}
+
+# Unknown model names fall back to the OpenAI API
+FALLBACK_PROVIDER = "src.models.openai:OpenAIModel"
+
+
+def load_class(target):
+    module_name, class_name = target.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def get_model_class(model_name):
+    if "gemini" in model_name:
+        raise ValueError(f"Gemini models are temporarily disabled: {model_name}")
+    return load_class(MODEL_REGISTRY.get(model_name, FALLBACK_PROVIDER))
+
+
+def get_model(model_name):
+    return get_model_class(model_name)(model_name)
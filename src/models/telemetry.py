@@ -0,0 +1,240 @@
+
+import os
+import json
+import time
+import threading
+import requests
+
+QUANTILES = [0.5, 0.95, 0.99]
+
+
+def classify_error(exc):
+    """Maps a request exception onto a small error taxonomy."""
+    if isinstance(exc, requests.exceptions.Timeout):
+        return "timeout"
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        return "connection"
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+        if status == 429:
+            return "throttled"
+        return f"http_{status // 100}xx"
+    if isinstance(exc, (ValueError, KeyError, IndexError)):
+        return "bad_response"
+    return type(exc).__name__
+
+
+class RequestTrace:
+    """
+    Measures one logical request (including its retries). Used as a context manager
+    around send(); the record is stored when the block exits, failed or not.
+    """
+
+    def __init__(self, model, endpoint):
+        self.model = model
+        self.endpoint = endpoint
+        self.status = None
+        self.retries = 0
+        self.ttft = None
+        self.usage = None
+        self.error = None
+        self.latency = None
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def sent(self):
+        """Restarts the clock once the rate limiter lets the first attempt through."""
+        self._start = time.perf_counter()
+
+    def elapsed(self):
+        """Seconds since the request was sent."""
+        return time.perf_counter() - self._start
+
+    def first_token(self):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._start
+
+    def set_usage(self, usage):
+        if usage:
+            self.usage = usage
+
+    def __exit__(self, exc_type, exc, tb):
+        self.latency = time.perf_counter() - self._start
+        if exc is not None:
+            self.error = classify_error(exc)
+            response = getattr(exc, "response", None)
+            if response is not None:
+                self.status = response.status_code
+        _collector.add(self)
+        return False
+
+    def as_dict(self):
+        usage = self.usage or {}
+        details = usage.get("completion_tokens_details") or {}
+        return {
+            "model": self.model,
+            "endpoint": self.endpoint,
+            "latency": self.latency,
+            "ttft": self.ttft,
+            "status": self.status,
+            "retries": self.retries,
+            "error": self.error,
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "reasoning_tokens": details.get("reasoning_tokens")
+        }
+
+
+class TelemetryCollector:
+    """Keeps every request record of the process for the end-of-run summary."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = []
+
+    def add(self, trace):
+        record = trace.as_dict()
+        with self._lock:
+            self._records.append(record)
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+
+_collector = TelemetryCollector()
+
+
+def track(model, endpoint):
+    return RequestTrace(model, endpoint)
+
+
+def _quantiles(values):
+    import numpy as np  # Only needed for the end-of-run summary
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return {str(q): float(np.quantile(values, q)) for q in QUANTILES}
+
+
+def summarize(records=None):
+    """
+    Aggregates request records per (model, endpoint).
+
+    Returns:
+        list of dicts with request/error counts, retries, token totals and
+        p50/p95/p99 of latency, time-to-first-token and completion tokens/s
+    """
+    records = _collector.records() if records is None else records
+    groups = {}
+    for record in records:
+        groups.setdefault((record["model"], record["endpoint"]), []).append(record)
+
+    summary = []
+    for (model, endpoint), group in sorted(groups.items()):
+        ok = [record for record in group if record["error"] is None]
+        errors, statuses = {}, {}
+        for record in group:
+            if record["error"]:
+                errors[record["error"]] = errors.get(record["error"], 0) + 1
+            if record["status"] is not None:
+                statuses[str(record["status"])] = statuses.get(str(record["status"]), 0) + 1
+        summary.append({
+            "model": model,
+            "endpoint": endpoint,
+            "requests": len(group),
+            "errors": errors,
+            "statuses": statuses,
+            "retries": sum(record["retries"] for record in group),
+            "prompt_tokens": sum(record["prompt_tokens"] or 0 for record in group),
+            "completion_tokens": sum(record["completion_tokens"] or 0 for record in group),
+            "reasoning_tokens": sum(record["reasoning_tokens"] or 0 for record in group),
+            "latency": _quantiles([record["latency"] for record in ok]),
+            "ttft": _quantiles([record["ttft"] for record in ok]),
+            "tokens_per_second": _quantiles([
+                record["completion_tokens"] / record["latency"]
+                for record in ok if record["completion_tokens"] and record["latency"]
+            ])
+        })
+    return summary
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in labels.items())
+
+
+def to_prometheus(summary, prefix="benchmark"):
+    """Renders a summary in the Prometheus text exposition format."""
+    lines = []
+
+    def _metric(name, kind, help_text):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+    _metric("requests_total", "counter", "Requests sent, by final HTTP status")
+    for entry in summary:
+        for status, count in entry["statuses"].items():
+            lines.append(f'{prefix}_requests_total{{{_labels(model=entry["model"], endpoint=entry["endpoint"], status=status)}}} {count}')
+    _metric("request_errors_total", "counter", "Failed requests by error class")
+    for entry in summary:
+        for error, count in entry["errors"].items():
+            lines.append(f'{prefix}_request_errors_total{{{_labels(model=entry["model"], endpoint=entry["endpoint"], error=error)}}} {count}')
+    _metric("request_retries_total", "counter", "Retries after throttling or dropped connections")
+    for entry in summary:
+        lines.append(f'{prefix}_request_retries_total{{{_labels(model=entry["model"], endpoint=entry["endpoint"])}}} {entry["retries"]}')
+    _metric("tokens_total", "counter", "Tokens reported in usage")
+    for entry in summary:
+        for kind in ["prompt", "completion", "reasoning"]:
+            labels = _labels(model=entry["model"], endpoint=entry["endpoint"], kind=kind)
+            lines.append(f'{prefix}_tokens_total{{{labels}}} {entry[f"{kind}_tokens"]}')
+
+    for key, name, help_text in [
+        ("latency", "request_latency_seconds", "Wall latency of successful requests"),
+        ("ttft", "time_to_first_token_seconds", "Time to first streamed token"),
+        ("tokens_per_second", "completion_tokens_per_second", "Completion tokens per second of latency"),
+    ]:
+        _metric(name, "summary", help_text)
+        for entry in summary:
+            if not entry[key]:
+                continue
+            for q, value in entry[key].items():
+                labels = _labels(model=entry["model"], endpoint=entry["endpoint"], quantile=q)
+                lines.append(f"{prefix}_{name}{{{labels}}} {value:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def export_telemetry(output_dir):
+    """
+    Writes telemetry.json (summary + raw records) and telemetry.prom into output_dir.
+
+    Returns:
+        The summary, or None when no requests were made
+    """
+    records = _collector.records()
+    if not records:
+        return None
+    summary = summarize(records)
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "telemetry.json"), "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "requests": records}, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(output_dir, "telemetry.prom"), "w", encoding="utf-8") as f:
+        f.write(to_prometheus(summary))
+    print(f"Request telemetry saved to {output_dir}/telemetry.json and telemetry.prom")
+    return summary
+
+
+def print_telemetry_summary(summary=None):
+    summary = summarize() if summary is None else summary
+    for entry in summary:
+        latency = entry["latency"] or {}
+        ttft = entry["ttft"] or {}
+        line = (f"{entry['model']}: {entry['requests']} requests, "
+                f"latency p50 {latency.get('0.5', 0):.2f}s p95 {latency.get('0.95', 0):.2f}s p99 {latency.get('0.99', 0):.2f}s")
+        if ttft:
+            line += f", TTFT p50 {ttft['0.5']:.2f}s"
+        if entry["errors"]:
+            line += f", errors {entry['errors']}"
+        print(line)
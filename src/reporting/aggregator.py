@@ -1,50 +1,80 @@
-
 import os
 import pandas as pd
 import glob
 import config
-from src.evaluation.metrics import calculate_accuracy
+from src.evaluation.metrics import SCORER_VERSION
+from src.evaluation.scoring import accuracy
+from src.evaluation.store import list_task_files, parse_task_path, read_task_file
+from .score_index import ScoreIndex
 
 def aggregate_results(results_dir=None):
+    """
+    Scores every result file into one row per (run, model, task).
+    Scores are memoised in a score index, so only new or changed files are read.
+    """
     if results_dir is None:
         results_dir = config.RESULTS_DIR
-        
-    all_files = glob.glob(os.path.join(results_dir, "*.csv"))
     
-    aggregated_records = []
+    # The Parquet store is read for the columns needed for scoring only. Per-task CSVs are
+    # read too, so runs from before the store (or not yet imported) stay on the leaderboard
+    store_files = list_task_files(results_dir)
+    csv_files = [
+        filename for filename in glob.glob(os.path.join(results_dir, "*.csv"))
+        if "leaderboard" not in filename and "aggregated" not in filename and "packing_report" not in filename and not filename.endswith("_scored.csv")
+    ]
     
-    for filename in all_files:
-        if "leaderboard" in filename or "aggregated" in filename:
-            continue
-            
-        try:
-            df = pd.read_csv(filename)
-            if df.empty:
-                continue
-                
-            # Assume strict columns exist if produced by our runner
-            if "model" not in df.columns:
-                # Fallback or skip
-                continue
-                
-            model = df["model"].iloc[0]
-            benchmark = df["benchmark"].iloc[0]
-            task = df["task"].iloc[0]
-            
-            # Calculate score
-            # Determine metric based on benchmark?
-            # For now, default to accuracy.
-            score = calculate_accuracy(df["prediction"].astype(str).tolist(), df["reference"].astype(str).tolist())
-            
-            aggregated_records.append({
-                "Model": model,
-                "Benchmark": benchmark,
-                "Task": task,
-                "Score": score,
-                "Samples": len(df)
-            })
-            
-        except Exception as e:
-            print(f"Error parsing {filename}: {e}")
+    index = ScoreIndex(results_dir, SCORER_VERSION)
+    store_records, csv_records = [], []
+    
+    for files, score_file, records in [(store_files, _score_store_file, store_records),
+                                       (csv_files, _score_csv_file, csv_records)]:
+        for filename in files:
+            try:
+                records.extend(index.get_or_score(filename, score_file))
+            except Exception as e:
+                print(f"Error parsing {filename}: {e}")
+    
+    # A run written in both formats counts once, from the store
+    stored = {(record["Run"], record["Model"], record["Task"]) for record in store_records}
+    aggregated_records = store_records + [
+        record for record in csv_records if (record["Run"], record["Model"], record["Task"]) not in stored
+    ]
+    
+    index.save()
+    if index.misses:
+        print(f"Scored {index.misses} new or changed result files ({index.hits} from score index)")
             
     return pd.DataFrame(aggregated_records)
+
+def _record(run, model, benchmark, task, df):
+    # Accuracy after answer extraction (same engine as analyze_results.py)
+    score = accuracy(df["prediction"], df["reference"], task)
+    return {
+        "Run": run,
+        "Model": model,
+        "Benchmark": benchmark,
+        "Task": task,
+        "Score": score,
+        "Samples": len(df)
+    }
+
+def _score_store_file(filename):
+    run, model, benchmark, task = parse_task_path(filename)
+    df = read_task_file(filename, columns=["prediction", "reference"])
+    if df.empty:
+        return []
+    return [_record(run, model, benchmark, task, df)]
+
+def _score_csv_file(filename):
+    df = pd.read_csv(filename, usecols=lambda column: column in ["model", "benchmark", "task", "prediction", "reference"])
+    
+    # Assume strict columns exist if produced by our runner
+    if df.empty or "model" not in df.columns:
+        return []
+    
+    model, task = df["model"].iloc[0], df["task"].iloc[0]
+    # "{run_id}_{model}_{task}.csv", where the run id may be a custom --run-id
+    stem = os.path.basename(filename)[:-len(".csv")]
+    suffix = f"_{model}_{task}"
+    run = stem[:-len(suffix)] if stem.endswith(suffix) else None
+    return [_record(run, model, df["benchmark"].iloc[0], task, df)]
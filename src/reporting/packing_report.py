@@ -0,0 +1,60 @@
+import pandas as pd
+import config
+from src.evaluation.scoring import score_predictions
+from src.evaluation.journal import read_run_config
+from src.evaluation.store import read_results
+
+PACKABLE_BENCHMARKS = ["kmmlu", "haerae"]
+
+
+def generate_packing_report(results_dir=None):
+    """
+    Compares accuracy of packed runs (several questions per request) against
+    unpacked runs of the same model and tasks, per benchmark.
+    Only generative answers are compared (packing does not apply to logprob scoring):
+    runs saved with another EVAL_MODE, and rows answered from option logprobs, are left out.
+    Of the rest, the latest run per (model, task, pack size) is used, and only tasks
+    evaluated both ways are compared.
+    """
+    df = read_results(columns=["run", "model", "benchmark", "task", "prediction", "reference", "pack_size", "packed",
+                               "option_probs"],
+                      results_dir=results_dir)
+    df = df[df["benchmark"].isin(PACKABLE_BENCHMARKS)].copy()
+    modes = {run: (read_run_config(run, results_dir) or {}).get("EVAL_MODE", "generate") for run in df["run"].unique()}
+    df = df[(df["run"].map(modes) == "generate") & df["option_probs"].isna()].copy()
+    if df.empty:
+        print("No generative KMMLU/HAE-RAE results to compare.")
+        return None
+
+    df["pack_size"] = df["pack_size"].fillna(1).astype(int)
+    latest = df.groupby(["model", "task", "pack_size"])["run"].transform("max")
+    df = df[df["run"] == latest]
+
+    df["correct"] = False
+    for task, rows in df.groupby("task"):
+        df.loc[rows.index, "correct"] = score_predictions(rows["prediction"], rows["reference"], task).values
+    df["reissued"] = (df["pack_size"] > 1) & (df["packed"] == False)
+
+    # Keep tasks that have both an unpacked and a packed result for the model
+    sizes = df.groupby(["model", "task"])["pack_size"].agg(lambda s: 1 in set(s) and len(set(s)) > 1)
+    compared = sizes[sizes].index
+    df = df.set_index(["model", "task"]).loc[compared].reset_index() if len(compared) else df.iloc[0:0]
+    if df.empty:
+        print("No tasks evaluated both packed and unpacked.")
+        return None
+
+    report = df.groupby(["model", "benchmark", "pack_size"]).agg(
+        Accuracy=("correct", "mean"),
+        Samples=("correct", "size"),
+        Reissued=("reissued", "mean")
+    ).reset_index()
+    baseline = report[report["pack_size"] == 1].set_index(["model", "benchmark"])["Accuracy"]
+    report["Delta"] = report["Accuracy"] - report.set_index(["model", "benchmark"]).index.map(baseline)
+    report = report.rename(columns={"model": "Model", "benchmark": "Benchmark", "pack_size": "PackSize"})
+
+    timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+    output_path = f"{results_dir or config.RESULTS_DIR}/packing_report_{timestamp}.csv"
+    report.to_csv(output_path, index=False)
+    print(f"Packing report saved to {output_path}")
+    print(report.to_string(index=False))
+    return report
@@ -0,0 +1,72 @@
+
+import os
+import json
+import threading
+
+INDEX_NAME = ".score_index.json"
+
+class ScoreIndex:
+    """
+    Memo of per-file scores keyed by file path, size, mtime and scorer version.
+    A result file is only re-read and re-scored when one of those changes.
+    """
+
+    def __init__(self, results_dir, scorer_version):
+        self.path = os.path.join(results_dir, INDEX_NAME)
+        self.scorer_version = scorer_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                # A corrupt index only costs a full rescore
+                self._entries = {}
+
+    @staticmethod
+    def _signature(filename):
+        stat = os.stat(filename)
+        return stat.st_size, stat.st_mtime_ns
+
+    def get_or_score(self, filename, score_file):
+        """
+        Returns the score records for filename, calling score_file(filename) only
+        when the file is new, changed, or was scored by another scorer version.
+        """
+        size, mtime = self._signature(filename)
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry and entry["size"] == size and entry["mtime"] == mtime \
+                    and entry["scorer_version"] == self.scorer_version:
+                self.hits += 1
+                return entry["records"]
+
+        records = score_file(filename)
+        with self._lock:
+            self.misses += 1
+            self._entries[filename] = {
+                "size": size,
+                "mtime": mtime,
+                "scorer_version": self.scorer_version,
+                "records": records
+            }
+            self._dirty = True
+        return records
+
+    def save(self):
+        """Writes the index back to disk, dropping entries for files that no longer exist."""
+        with self._lock:
+            stale = [filename for filename in self._entries if not os.path.exists(filename)]
+            for filename in stale:
+                del self._entries[filename]
+            if not (self._dirty or stale):
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
@@ -0,0 +1,43 @@
+import threading
+import config
+from src.models import get_model
+
+
+def test_concurrent_identical_requests_reach_the_endpoint_once(workspace, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_MODE", "use")
+    workspace.settings.latency_median = 0.3
+    model = get_model("gpt-5.2")
+    outputs = []
+    threads = [threading.Thread(target=lambda: outputs.append(model.generate("같은 질문", max_tokens=16)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert workspace.requests == 1
+    assert len(set(outputs)) == 1 and not outputs[0].startswith("Error:")
+
+    # Later identical requests, and ones from a new run (new model instance), are cache hits
+    assert get_model("gpt-5.2").generate("같은 질문", max_tokens=16) == outputs[0]
+    assert workspace.requests == 1
+
+
+def test_errors_are_not_cached(workspace, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_MODE", "use")
+    monkeypatch.setattr(config, "MAX_RETRIES", 0)
+    workspace.settings.error_rate = 1.0
+    model = get_model("gpt-5.2")
+    assert model.generate("질문", max_tokens=16).startswith("Error:")
+    workspace.settings.error_rate = 0.0
+    assert not model.generate("질문", max_tokens=16).startswith("Error:")
+
+
+def test_refresh_re_requests_and_bypass_skips_the_cache(workspace, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_MODE", "use")
+    model = get_model("gpt-5.2")
+    model.generate("질문", max_tokens=16)
+    monkeypatch.setattr(config, "CACHE_MODE", "refresh")
+    model.generate("질문", max_tokens=16)
+    monkeypatch.setattr(config, "CACHE_MODE", "bypass")
+    model.generate("질문", max_tokens=16)
+    assert workspace.requests == 3
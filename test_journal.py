@@ -0,0 +1,56 @@
+import os
+import glob
+import shutil
+import pandas as pd
+from src.evaluation.journal import RunJournal, get_run_dir
+from src.evaluation.runner import run_evaluation
+from src.evaluation.store import find_run_outputs, read_run_output
+
+
+def read_outputs(run_id):
+    """{(model, task): (Parquet rows, CSV rows)} of a run."""
+    return {key: (read_run_output({"parquet": output["parquet"]}), read_run_output({"csv": output["csv"]}))
+            for key, output in find_run_outputs(run_id).items()}
+
+
+def test_journal_skips_completed_and_tolerates_a_torn_line(tmp_path):
+    journal = RunJournal("r", results_dir=str(tmp_path))
+    journal.record("m", "kobest_boolq", 0, {"prediction": "1"})
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"model": "m", "task": "kobest_boolq", "ind')
+
+    # Resume twice: the record written after the torn line must survive the second load
+    journal = RunJournal("r", results_dir=str(tmp_path))
+    assert journal.completed("m", "kobest_boolq") == {0: {"prediction": "1"}}
+    journal.record("m", "kobest_boolq", 1, {"prediction": "0"})
+    journal.close()
+    journal = RunJournal("r", results_dir=str(tmp_path))
+    assert journal.completed("m", "kobest_boolq") == {0: {"prediction": "1"}, 1: {"prediction": "0"}}
+    journal.close()
+
+
+def test_resume_requests_only_unfinished_samples(workspace):
+    run_evaluation(new_run_id="r1")
+    expected = read_outputs("r1")
+    total = workspace.requests
+    assert total == 2 * 5 * 8
+
+    # Interrupt the run: the journal keeps 30 samples (and a torn last line), outputs are lost
+    path = os.path.join(get_run_dir("r1"), "journal.jsonl")
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(lines[:30])
+        f.write(lines[30][:25])
+    shutil.rmtree("results/store")
+    for csv in glob.glob("results/r1_*.csv"):
+        os.remove(csv)
+
+    run_evaluation(run_id="r1")
+    assert workspace.requests - total == total - 30
+    resumed = read_outputs("r1")
+    assert resumed.keys() == expected.keys()
+    for key, (parquet, csv) in expected.items():
+        pd.testing.assert_frame_equal(resumed[key][0], parquet)
+        pd.testing.assert_frame_equal(resumed[key][1], csv)
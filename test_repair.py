@@ -0,0 +1,63 @@
+import os
+import pandas as pd
+import config
+from src.evaluation.runner import run_evaluation
+from src.evaluation.repair import repair_run, classify_failures
+from src.evaluation.store import find_run_outputs, read_task_file, write_task_results
+
+RUN_ID = "nightly_kobest"
+KEY = ("gpt-oss-20b", "kobest_boolq")
+BROKEN = {0: "Error: 500 Internal Server Error", 1: "", 2: "답은 0"}
+
+
+def break_outputs(output):
+    """Writes failed predictions into both formats of one task output."""
+    df = read_task_file(output["parquet"])
+    csv = pd.read_csv(output["csv"], dtype=str, keep_default_na=False)
+    for pos, prediction in BROKEN.items():
+        df.loc[pos, "prediction"] = prediction
+        csv.loc[pos, "prediction"] = prediction
+    write_task_results(RUN_ID, KEY[0], output["benchmark"], KEY[1], df.to_dict("records"))
+    csv.to_csv(output["csv"], index=False)
+
+
+def test_classify_failures_leaves_short_answers_alone():
+    kinds = classify_failures(pd.Series(["Error: timeout", " ", None, "답은 0", "0"])).tolist()
+    assert kinds == ["error", "empty", "empty", None, None]
+
+
+def test_repair_updates_every_format(workspace):
+    run_evaluation(new_run_id=RUN_ID)
+    output = find_run_outputs(RUN_ID)[KEY]
+    break_outputs(output)
+    # A run from before the store only has the CSV; repair writes the Parquet file too
+    os.remove(output["parquet"])
+    requests = workspace.requests
+
+    summary = repair_run(RUN_ID)
+    assert summary == {"failed": 2, "repaired": 2, "remaining": 0}
+    assert workspace.requests - requests == 2
+
+    output = find_run_outputs(RUN_ID)[KEY]
+    for df in (read_task_file(output["parquet"]), pd.read_csv(output["csv"], dtype=str, keep_default_na=False)):
+        assert len(df) == config.SAMPLE_SIZE
+        assert classify_failures(df["prediction"]).isna().all()
+        assert df.loc[2, "prediction"] == "답은 0"
+
+
+def test_repair_legacy_run_without_saved_settings(workspace):
+    # Per-task CSV of a run from before run.json, Parquet and sample ids
+    path = "results/20260118_175403_gpt-5.2_kobest_boolq.csv"
+    predictions = ["1", "Error: 503 Service Unavailable", "", "0"]
+    pd.DataFrame({
+        "model": "gpt-5.2", "benchmark": "kobest", "task": "kobest_boolq",
+        "prompt": [f"질문 {i}" for i in range(4)], "prediction": predictions,
+        "reference": ["1", "0", "1", "0"], "full_sample": "{}",
+    }).to_csv(path, index=False)
+
+    assert repair_run("20260118_175403") == {"failed": 2, "repaired": 2, "remaining": 0}
+    assert workspace.requests == 2
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    assert classify_failures(df["prediction"]).isna().all()
+    assert df.loc[[0, 3], "prediction"].tolist() == ["1", "0"]
+    assert df["prompt"].tolist() == [f"질문 {i}" for i in range(4)]
@@ -0,0 +1,70 @@
+import re
+import random
+from src.evaluation.scoring import score_predictions
+
+# Row-by-row scorer that analyze_results.py used before src/evaluation/scoring.py,
+# kept here as the reference the vectorised engine must agree with
+
+def legacy_extract_answer(text):
+    text = text.strip()
+    if not text: return ""
+    match = re.search(r'(?:정답|Answer|답)[:\s]*(?:\*\*|\[)?([1-5A-E])(?:\*\*|\])?', text, re.IGNORECASE)
+    if match:
+        return match.group(1).upper()
+    match = re.search(r'([1-5])\s*번', text)
+    if match:
+        return match.group(1)
+    match = re.match(r'^([1-5A-E])(?:\.|\)|:|$)', text, re.IGNORECASE)
+    if match:
+        return match.group(1).upper()
+    lower_text = text.lower()
+    if lower_text.startswith("yes") or lower_text.startswith("true") or "정답: 예" in text or "정답: 참" in text:
+        return "1"
+    if lower_text.startswith("no") or lower_text.startswith("false") or "정답: 아니오" in text or "정답: 거짓" in text:
+        return "0"
+    return text
+
+def legacy_normalize_match(pred, ref, task_name):
+    mapping = {'A': '1', 'B': '2', 'C': '3', 'D': '4', 'E': '5', 'TRUE': '1', 'FALSE': '0', 'YES': '1', 'NO': '0'}
+    pred_norm = mapping.get(pred.upper(), pred)
+    ref_norm = mapping.get(str(ref).upper(), str(ref))
+    if "hellaswag" in task_name or "copa" in task_name:
+        try:
+            if int(pred_norm) - 1 == int(ref_norm):
+                return True
+        except:
+            pass
+    return pred_norm == ref_norm
+
+TASKS = ["kobest_boolq", "kobest_copa", "kobest_hellaswag", "kobest_wic", "kmmlu_Accounting", "haerae_history"]
+
+# Inputs that separated earlier versions of the engine from the reference
+EDGE_CASES = [
+    "", " ", "1", " 2 ", "+1", "-0", "1_0", "١", "٢", "３", "01", "2.", "B)", "b", "e:", "정답: **2**", "정답은 2번",
+    "답은 0", "정답: [C]", "Answer: d", "yes", "No.", "TRUE", "false", "정답: 참", "정답: 아니오", "3 번", "  4  번",
+    "A. 설명", "12", "5번과 1번", "nan", "None", "Ⅱ", "²", "0x1", "1e0", "1.0", "  -1  ",
+]
+
+FRAGMENTS = ["정답", "답", "Answer", ":", " ", "**", "[", "]", "번", "1", "2", "3", "4", "5", "0", "A", "B", "c", "e",
+             "yes", "No", "true", "FALSE", "예", "참", "거짓", "아니오", ".", ")", "\n", "+", "-", "_", "١", "٣", "۲", "９"]
+
+
+def fixed_corpus(size=5000, seed=12):
+    rng = random.Random(seed)
+    corpus = list(EDGE_CASES)
+    while len(corpus) < size:
+        corpus.append("".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 6))))
+    references = [rng.choice(["0", "1", "2", "3", "4", "A", "B", "C", "D", "١"]) for _ in corpus]
+    return corpus, references
+
+def test_engine_matches_legacy_scorer():
+    predictions, references = fixed_corpus()
+    for task_name in TASKS:
+        engine = score_predictions(predictions, references, task_name).tolist()
+        legacy = [legacy_normalize_match(legacy_extract_answer(p), r, task_name) for p, r in zip(predictions, references)]
+        mismatches = [(p, r) for p, r, a, b in zip(predictions, references, engine, legacy) if a != b]
+        assert not mismatches, f"{task_name}: {len(mismatches)} mismatches, e.g. {mismatches[:5]}"
+
+if __name__ == "__main__":
+    test_engine_matches_legacy_scorer()
+    print("Scoring engine matches the legacy scorer")
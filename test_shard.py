@@ -0,0 +1,76 @@
+import os
+import shutil
+import pandas as pd
+import config
+from src.evaluation.runner import run_evaluation
+from src.evaluation.shard import in_shard, get_shard_dir, merge_shards
+from src.evaluation.store import find_run_outputs, read_task_file
+
+SHARDS = 3
+
+
+def read_outputs(run_id):
+    """{(model, task): (Parquet rows, CSV rows)} of a run in RESULTS_DIR."""
+    return {key: (read_task_file(output["parquet"]), pd.read_csv(output["csv"], dtype=str, keep_default_na=False))
+            for key, output in find_run_outputs(run_id).items()}
+
+
+def run_shards(monkeypatch, run_id, count=SHARDS):
+    for index in range(1, count + 1):
+        monkeypatch.setattr(config, "SHARD", (index, count))
+        monkeypatch.setattr(config, "RESULTS_DIR", get_shard_dir(run_id, (index, count), "results"))
+        run_evaluation(new_run_id=run_id)
+    monkeypatch.setattr(config, "SHARD", None)
+    monkeypatch.setattr(config, "RESULTS_DIR", "results")
+
+
+def test_every_item_lands_in_exactly_one_shard():
+    for count in (1, 2, 3, 7):
+        for task_name in ("kobest_boolq", "kmmlu_Accounting"):
+            for index in range(200):
+                owners = [i for i in range(1, count + 1) if in_shard("gpt-5.2", task_name, index, (i, count))]
+                assert len(owners) == 1
+
+
+def test_merged_shards_equal_a_single_node_run(workspace, monkeypatch):
+    # "sh" is a prefix of "sh_single": the merge must not pick up the other run's files
+    run_evaluation(new_run_id="sh_single")
+    single = read_outputs("sh_single")
+    requests = workspace.requests
+
+    run_shards(monkeypatch, "sh")
+    assert workspace.requests - requests == requests
+    assert merge_shards("sh") == {key: config.SAMPLE_SIZE for key in single}
+
+    merged = read_outputs("sh")
+    assert merged.keys() == single.keys()
+    for key, (parquet, csv) in single.items():
+        pd.testing.assert_frame_equal(merged[key][0], parquet)
+        pd.testing.assert_frame_equal(merged[key][1], csv)
+
+
+def test_merge_refuses_incomplete_shards(workspace, monkeypatch):
+    run_shards(monkeypatch, "sh")
+    shutil.rmtree(get_shard_dir("sh", (2, SHARDS), "results"))
+    assert merge_shards("sh") is None
+    assert find_run_outputs("sh") == {}
+
+
+def test_merge_refuses_shards_missing_a_format(workspace, monkeypatch):
+    run_shards(monkeypatch, "sh")
+    outputs = find_run_outputs("sh", get_shard_dir("sh", (1, SHARDS), "results"))
+    os.remove(next(iter(outputs.values()))["csv"])
+    assert merge_shards("sh") is None
+    assert find_run_outputs("sh") == {}
+
+
+def test_merge_refuses_a_shard_whose_task_failed(workspace, monkeypatch, capsys):
+    run_shards(monkeypatch, "sh")
+    # run_plan logs a failed task and moves on, so the shard finishes without its output
+    shard_dir = get_shard_dir("sh", (2, SHARDS), "results")
+    for path in find_run_outputs("sh", shard_dir)[("gpt-5.2", "kobest_boolq")].values():
+        if path.endswith((".csv", ".parquet")):
+            os.remove(path)
+    assert merge_shards("sh") is None
+    assert "gpt-5.2 kobest_boolq" in capsys.readouterr().out
+    assert find_run_outputs("sh") == {}
@@ -0,0 +1,16 @@
+import pandas as pd
+from src.evaluation.samples import row_prompt
+from src.evaluation.store import import_csv_results, find_run_outputs, read_run_output
+
+
+def test_imported_legacy_rows_keep_their_prompts(tmp_path):
+    # Per-task CSV of a run from before sample ids: the prompt is the only way back to the question
+    pd.DataFrame({
+        "model": "gpt-5.2", "benchmark": "kobest", "task": "kobest_boolq",
+        "prompt": ["질문 0", "질문 1"], "prediction": ["1", "0"], "reference": ["1", "1"], "full_sample": "{}",
+    }).to_csv(tmp_path / "20260118_175403_gpt-5.2_kobest_boolq.csv", index=False)
+
+    assert import_csv_results(str(tmp_path)) == 1
+    output = find_run_outputs("20260118_175403", str(tmp_path))[("gpt-5.2", "kobest_boolq")]
+    df = read_run_output({"parquet": output["parquet"]})
+    assert [row_prompt(row) for _, row in df.iterrows()] == ["질문 0", "질문 1"]
@@ -0,0 +1,106 @@
+import time
+import threading
+import config
+from src.evaluation.runner import run_evaluation
+from src.evaluation.store import find_run_outputs, read_run_output
+from src.evaluation.workqueue import WorkQueue, get_queue_path
+
+ITEMS = [("m1", "kobest_boolq", i) for i in range(40)] + [("m2", "kobest_boolq", i) for i in range(10)]
+
+
+def make_queue(tmp_path, monkeypatch, timeout=0.3):
+    monkeypatch.setattr(config, "QUEUE_VISIBILITY_TIMEOUT", timeout)
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    queue.publish(ITEMS)
+    return queue
+
+
+def test_leases_are_exclusive(tmp_path, monkeypatch):
+    make_queue(tmp_path, monkeypatch, timeout=60).close()
+    leased = {}
+
+    def _worker(worker_id):
+        # Every worker has its own connection, as separate processes would
+        queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+        leased[worker_id] = []
+        while rows := queue.lease(worker_id, "m1", 3):
+            leased[worker_id] += [row[0] for row in rows]
+        queue.close()
+
+    threads = [threading.Thread(target=_worker, args=(f"w{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ids = [item_id for rows in leased.values() for item_id in rows]
+    assert sorted(ids) == list(range(1, 41))
+
+
+def test_expired_leases_move_to_another_worker(tmp_path, monkeypatch):
+    queue = make_queue(tmp_path, monkeypatch, timeout=0.5)
+    rows = queue.lease("w1", "m1", 40)
+    assert not queue.lease("w2", "m1", 40)
+
+    # Heartbeats keep the leases; without them they expire and are reclaimed
+    time.sleep(0.3)
+    queue.heartbeat("w1")
+    time.sleep(0.3)
+    assert not queue.lease("w2", "m1", 40)
+    time.sleep(0.4)
+    queue.register("w2", ["m1"])
+    assert queue.counts("m1")["expired"] == 40
+    assert queue.lease("w2", "m1", 2) == rows[:2]
+
+    # Only the current holder's result is accepted
+    assert not queue.complete("w1", rows[0][0], {"prediction": "late"})
+    assert queue.complete("w2", rows[0][0], {"prediction": "1"})
+    assert queue.results("m1", "kobest_boolq") == [{"prediction": "1"}]
+
+
+def test_unserved_models_do_not_block_draining(tmp_path, monkeypatch):
+    queue = make_queue(tmp_path, monkeypatch, timeout=60)
+    queue.register("w1", ["m1"])
+    for item_id, _, index in queue.lease("w1", "m1", 40):
+        queue.complete("w1", item_id, {"prediction": str(index)})
+    assert queue.drained()
+    assert queue.counts()["unserved"] == 10 and queue.counts()["done"] == 40
+    # A worker that can serve m2 turns its items back into work
+    queue.register("w2", ["m2"])
+    assert not queue.drained() and queue.counts("m2")["pending"] == 10
+
+
+def test_finalize_claim_expires_and_reopens_for_late_results(tmp_path, monkeypatch):
+    queue = make_queue(tmp_path, monkeypatch)
+    for item_id, _, _ in queue.lease("w1", "m1", 40):
+        queue.complete("w1", item_id, {})
+    assert queue.claim_finalize("w1")
+    assert not queue.claim_finalize("w2")
+
+    # w1 died while writing the outputs: its claim expires and w2 takes over
+    time.sleep(0.4)
+    assert queue.claim_finalize("w2")
+    queue.mark_finalized("w1")
+    assert not queue.finalized()
+    queue.mark_finalized("w2")
+    assert queue.finalized() and not queue.claim_finalize("w1")
+
+    # Results completed after finalizing (a late worker) let the outputs be rewritten
+    for item_id, _, _ in queue.lease("w3", "m2", 10):
+        queue.complete("w3", item_id, {})
+    assert queue.claim_finalize("w3")
+
+
+def test_queue_run_writes_every_output(workspace, monkeypatch, capsys):
+    monkeypatch.setattr(config, "QUEUE_MODE", True)
+    monkeypatch.setattr(config, "MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(config, "QUEUE_POLL_INTERVAL", 0.1)
+    run_evaluation(new_run_id="q")
+    assert workspace.requests == 2 * 5 * 8
+    queue = WorkQueue(get_queue_path("q"))
+    assert queue.finalized() and queue.counts()["done"] == 2 * 5 * 8
+    queue.close()
+    outputs = find_run_outputs("q")
+    assert len(outputs) == 2 * 5
+    assert all(len(read_run_output(output)) == 8 for output in outputs.values())
+    # Leases are evaluated quietly; the worker reports progress per model
+    assert "Evaluating" not in capsys.readouterr().out